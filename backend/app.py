@@ -7,21 +7,25 @@ import os
 from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
+from config.json_provider import json_provider_class
 
 load_dotenv()
 
 app = Flask(__name__)
+app.json = json_provider_class()(app)
 CORS(app)
 
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
 app.config['DEBUG'] = os.getenv('DEBUG', 'False').lower() == 'true'
 
-from routes import insights, trends, predictions, students
+from routes import insights, trends, predictions, students, async_students, admin
 
 app.register_blueprint(insights.bp, url_prefix='/api/insights')
 app.register_blueprint(trends.bp, url_prefix='/api/trends')
 app.register_blueprint(predictions.bp, url_prefix='/api/predictions')
 app.register_blueprint(students.bp, url_prefix='/api/students')
+app.register_blueprint(async_students.bp, url_prefix='/api/async/students')
+app.register_blueprint(admin.bp, url_prefix='/api/admin')
 
 @app.route('/')
 def health_check():
@@ -40,6 +44,18 @@ def api_health():
         'service': 'lernexa-ai-backend'
     })
 
+@app.route('/api/health/pool')
+def pool_stats():
+    """MongoDB connection pool settings and counters for this worker"""
+    from config.database import db_config
+    return jsonify(db_config.pool_stats())
+
+@app.route('/api/health/cache')
+def cache_stats():
+    """Result cache statistics"""
+    from services.cache import result_cache
+    return jsonify(result_cache.stats())
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     debug = app.config['DEBUG']
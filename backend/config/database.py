@@ -1,25 +1,118 @@
 import os
-from pymongo import MongoClient
+import asyncio
+import threading
+from pymongo import MongoClient, AsyncMongoClient, monitoring
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Environment variable -> MongoClient keyword argument
+POOL_OPTIONS = {
+    'MONGO_MAX_POOL_SIZE': ('maxPoolSize', int),
+    'MONGO_MIN_POOL_SIZE': ('minPoolSize', int),
+    'MONGO_MAX_IDLE_TIME_MS': ('maxIdleTimeMS', int),
+    'MONGO_WAIT_QUEUE_TIMEOUT_MS': ('waitQueueTimeoutMS', int),
+    'MONGO_CONNECT_TIMEOUT_MS': ('connectTimeoutMS', int),
+    'MONGO_SERVER_SELECTION_TIMEOUT_MS': ('serverSelectionTimeoutMS', int),
+    'MONGO_SOCKET_TIMEOUT_MS': ('socketTimeoutMS', int),
+    'MONGO_READ_PREFERENCE': ('readPreference', str),
+}
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Counts connection pool events for the pool statistics endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {
+                'connections_created': 0,
+                'connections_closed': 0,
+                'checked_out': 0,
+                'checked_in': 0,
+                'checkout_failed': 0,
+                'pools_cleared': 0
+            }
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def pool_cleared(self, event):
+        self._count('pools_cleared')
+
+    def connection_created(self, event):
+        self._count('connections_created')
+
+    def connection_closed(self, event):
+        self._count('connections_closed')
+
+    def connection_checked_out(self, event):
+        self._count('checked_out')
+
+    def connection_checked_in(self, event):
+        self._count('checked_in')
+
+    def connection_check_out_failed(self, event):
+        self._count('checkout_failed')
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats['open_connections'] = stats['connections_created'] - stats['connections_closed']
+        stats['in_use'] = stats['checked_out'] - stats['checked_in']
+        return stats
+
 class DatabaseConfig:
     def __init__(self):
         self.connection_string = (
-            os.getenv('MONGODB_URI') or 
+            os.getenv('MONGODB_URI') or
             os.getenv('MONGO_URI', 'mongodb://localhost:27017/')
         )
         self.database_name = os.getenv('DATABASE_NAME', 'lernexa_ai')
         self.client = None
         self.db = None
+        self.pid = None
+        self.pool_monitor = PoolMonitor()
+        self._lock = threading.Lock()
+
+    def client_options(self):
+        """MongoClient keyword arguments from the MONGO_* pool settings"""
+        options = {'appname': os.getenv('MONGO_APP_NAME', 'lernexa-ai')}
+        for env_name, (option, cast) in POOL_OPTIONS.items():
+            value = os.getenv(env_name)
+            if value:
+                options[option] = cast(value)
+        return options
 
     def connect(self):
         """Establish connection to MongoDB"""
         try:
-            self.client = MongoClient(self.connection_string)
+            self.client = MongoClient(
+                self.connection_string,
+                event_listeners=[self.pool_monitor],
+                **self.client_options()
+            )
             self.client.admin.command('ping')
             self.db = self.client[self.database_name]
+            self.pid = os.getpid()
             print(f"Connected to MongoDB cluster: {self.connection_string}")
             print(f"Using database: {self.database_name}")
             return True
@@ -27,16 +120,98 @@ class DatabaseConfig:
             print(f"Database connection error: {e}")
             return False
 
+    def ensure_connected(self):
+        """Connect, or reconnect if this process was forked after connecting"""
+        if self.db is not None and self.pid == os.getpid():
+            return True
+        with self._lock:
+            if self.db is not None and self.pid == os.getpid():
+                return True
+            if self.pid != os.getpid():
+                self.reset_after_fork()
+            return self.connect()
+
+    def reset_after_fork(self):
+        """Drop the parent's client in a forked child; it must not be reused or closed"""
+        self.client = None
+        self.db = None
+        self.pid = None
+        self.pool_monitor.reset()
+
     def get_collection(self, collection_name):
         """Return a MongoDB collection if connected"""
+        # A client inherited across fork() (e.g. gunicorn --preload) is replaced on first use
+        if self.db is not None and self.pid != os.getpid():
+            self.ensure_connected()
         if self.db is not None:
             return self.db[collection_name]
         return None
 
+    def pool_stats(self):
+        """Connection pool settings and counters for this process"""
+        return {
+            'pid': os.getpid(),
+            'connected': self.db is not None and self.pid == os.getpid(),
+            'options': {k: v for k, v in self.client_options().items() if k != 'appname'},
+            'events': self.pool_monitor.stats()
+        }
+
     def close(self):
         """Close database connection"""
         if self.client is not None:
             self.client.close()
             print("Database connection closed.")
 
-db_config = DatabaseConfig()
\ No newline at end of file
+class AsyncDatabaseConfig:
+    """AsyncMongoClient living on one background event loop shared by all request threads
+
+    Async clients are bound to the event loop they were created on, while Flask
+    runs each async view on a short-lived loop of its own. Running every query
+    on one long-lived loop keeps a single connection pool per process.
+    """
+
+    def __init__(self, sync_config):
+        self.sync_config = sync_config
+        self.loop = None
+        self.client = None
+        self.db = None
+        self.pid = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name='mongo-async-loop', daemon=True)
+        thread.start()
+
+        async def create_client():
+            return AsyncMongoClient(
+                self.sync_config.connection_string,
+                event_listeners=[self.sync_config.pool_monitor],
+                **self.sync_config.client_options()
+            )
+
+        self.client = asyncio.run_coroutine_threadsafe(create_client(), loop).result()
+        self.db = self.client[self.sync_config.database_name]
+        self.loop = loop
+        self.pid = os.getpid()
+
+    def ensure_started(self):
+        """Start the loop and client, or restart them in a forked child"""
+        if self.loop is not None and self.pid == os.getpid():
+            return
+        with self._lock:
+            if self.loop is None or self.pid != os.getpid():
+                self._start()
+
+    def get_collection(self, collection_name):
+        """Return an async MongoDB collection"""
+        self.ensure_started()
+        return self.db[collection_name]
+
+    async def run(self, coro):
+        """Await a coroutine on the shared loop from any other event loop"""
+        self.ensure_started()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+db_config = DatabaseConfig()
+async_db_config = AsyncDatabaseConfig(db_config)
@@ -0,0 +1,72 @@
+"""
+JSON encoding for API responses
+
+OrjsonProvider replaces Flask's json module based provider when orjson is
+installed. Both encode ObjectId, NumPy scalars/arrays and datetimes natively,
+so services can return documents as they come from MongoDB. Student pages are
+bounded by MAX_PAGE_LIMIT, so every response is encoded once, in one call.
+"""
+
+import datetime
+import numpy as np
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(obj):
+    """Encode the types MongoDB documents and model outputs contain"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask's provider, extended with ObjectId, NumPy and ISO datetime support"""
+
+    @staticmethod
+    def default(obj):
+        try:
+            return _default(obj)
+        except TypeError:
+            return DefaultJSONProvider.default(obj)
+
+    def dumps_bytes(self, obj):
+        return self.dumps(obj).encode()
+
+
+class OrjsonProvider(JSONProvider):
+    """orjson-backed provider; keeps Flask's sorted keys unless sort_keys is False"""
+
+    def _options(self):
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps_bytes(self, obj):
+        return orjson.dumps(obj, default=_default, option=self._options())
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+
+def json_provider_class():
+    """The fastest provider available in this environment"""
+    return OrjsonProvider if orjson is not None else JSONProvider
@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for the Lernexa AI API
+
+Usage:
+  gunicorn -c gunicorn.conf.py wsgi:app
+  python start_server.py
+
+Send SIGHUP to the master for a graceful reload: new workers are forked from a
+freshly loaded app while the old ones finish their in-flight requests.
+"""
+
+import os
+import multiprocessing
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', 5000)}"
+
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+
+# Load the app, services and ML model once in the master, before forking workers
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers periodically; jitter avoids restarting them all at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 0))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
+
+def post_worker_init(worker):
+    """Warm each worker (MongoDB connection, model, routes) before it takes traffic"""
+    from wsgi import warmup
+    warmup()
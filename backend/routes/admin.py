@@ -0,0 +1,36 @@
+"""
+Admin API routes for database maintenance
+"""
+
+from flask import Blueprint, jsonify, request
+from services.container import services
+from services.indexes import ensure_indexes, index_status, explain_hot_queries
+from services.search import backfill_search_keys
+
+bp = Blueprint('admin', __name__)
+data_service = services.data_service
+
+@bp.route('/indexes', methods=['GET'])
+def get_indexes():
+    """Compare the students indexes with the spec and explain the hot queries"""
+    try:
+        collection = data_service.collection
+        result = index_status(collection)
+        if request.args.get('explain', 'true').lower() == 'true':
+            result['explain'] = explain_hot_queries(collection)
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/indexes', methods=['POST'])
+def apply_indexes():
+    """Add missing search keys, then create missing indexes from the spec and drop retired ones"""
+    try:
+        collection = data_service.collection
+        backfilled = backfill_search_keys(collection)
+        report = ensure_indexes(collection)
+        report['search_keys_backfilled'] = backfilled
+        report['status'] = index_status(collection)
+        return jsonify(report), 200 if not report['failed'] else 500
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
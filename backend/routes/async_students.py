@@ -0,0 +1,72 @@
+"""
+Async API routes for student data
+
+Same contract as routes/students.py, served by Flask async views on the async
+PyMongo driver so independent queries within a request run concurrently.
+Flask still serves these views from WSGI worker threads (one request per
+thread), so they lower a request's latency but do not raise a worker's
+request concurrency.
+"""
+
+from flask import Blueprint, jsonify, request
+from config.database import async_db_config
+from services.async_data_service import AsyncDataService
+from services.cache import result_cache
+from services.pagination import read_cursor, read_page_args
+from services.projections import parse_fields
+
+bp = Blueprint('async_students', __name__)
+data_service = AsyncDataService()
+
+@bp.route('/', methods=['GET'])
+async def get_students():
+    """Get list of students with optional filtering"""
+    try:
+        search = request.args.get('search', '')
+        include_total = request.args.get('total', 'true').lower() == 'true'
+
+        try:
+            page, limit = read_page_args(request.args)
+            cursor = read_cursor(request.args.get('cursor'), search)
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        students = await async_db_config.run(data_service.get_students(
+            page=page, limit=limit, search=search, cursor=cursor,
+            include_total=include_total, fields=fields
+        ))
+        return jsonify(students), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/<student_id>', methods=['GET'])
+async def get_student(student_id):
+    """Get a specific student by ID"""
+    try:
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        student = await async_db_config.run(data_service.get_student_by_id(student_id, fields=fields))
+        if not student:
+            return jsonify({'error': 'Student not found'}), 404
+        return jsonify(student), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/stats', methods=['GET'])
+async def get_student_stats():
+    """Get overall student statistics"""
+    try:
+        percentiles = request.args.get('percentiles', 'false').lower() == 'true'
+
+        # Same cache entry as GET /api/students/stats
+        stats = await result_cache.get_or_compute_async(
+            'students.stats', {'percentiles': percentiles},
+            lambda: async_db_config.run(data_service.get_student_stats(with_percentiles=percentiles))
+        )
+        return jsonify(stats), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
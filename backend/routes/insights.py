@@ -3,12 +3,12 @@ API routes for student insights and personalized recommendations
 """
 
 from flask import Blueprint, jsonify, request
-from services.data_service import DataService
-from services.insights_service import InsightsService
+from services.container import services
+from services.cache import result_cache
 
 bp = Blueprint('insights', __name__)
-data_service = DataService()
-insights_service = InsightsService()
+data_service = services.data_service
+insights_service = services.insights_service
 
 @bp.route('/student/<student_id>', methods=['GET'])
 def get_student_insights(student_id):
@@ -26,7 +26,9 @@ def get_student_insights(student_id):
 def get_overview():
     """Get overall insights overview"""
     try:
-        overview = insights_service.get_overview_insights()
+        overview = result_cache.get_or_compute(
+            'insights.overview', {}, insights_service.get_overview_insights
+        )
         return jsonify(overview), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -3,12 +3,12 @@ API routes for ML predictions
 """
 
 from flask import Blueprint, jsonify, request
-from services.data_service import DataService
-from services.ml_service import MLService
+from services.container import services
+from services.pagination import read_limit
 
 bp = Blueprint('predictions', __name__)
-data_service = DataService()
-ml_service = MLService()
+data_service = services.data_service
+ml_service = services.ml_service
 
 @bp.route('/completion-likelihood', methods=['POST'])
 def predict_completion():
@@ -65,10 +65,98 @@ def assess_risk():
 
 @bp.route('/train-model', methods=['POST'])
 def train_model():
-    """Train/retrain the ML model"""
+    """Start retraining the ML model in the background"""
     try:
-        result = ml_service.train_model()
-        return jsonify(result), 200
+        job, created = services.training_jobs.submit()
+        job['status_url'] = f"/api/predictions/train-model/{job['job_id']}"
+        return jsonify(job), 202 if created else 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/train-model/<job_id>', methods=['GET'])
+def get_training_job(job_id):
+    """Status and progress of a training job"""
+    try:
+        job = services.training_jobs.get(job_id)
+        if not job:
+            return jsonify({'error': 'Training job not found'}), 404
+        return jsonify(job), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/train-model', methods=['GET'])
+def list_training_jobs():
+    """Most recent training jobs, newest first"""
+    try:
+        limit = int(request.args.get('limit', 20))
+        return jsonify({'jobs': services.training_jobs.recent(limit)}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/materialize', methods=['POST'])
+def materialize_scores():
+    """Re-score the whole cohort and store the results"""
+    try:
+        result = ml_service.materialize_scores()
+        status = 200 if result.get('success') else 500
+        return jsonify(result), status
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/at-risk', methods=['GET'])
+def get_at_risk_students():
+    """List students by materialized dropout risk level"""
+    try:
+        level = request.args.get('level', 'critical')
+        
+        if level not in ('critical', 'high', 'medium', 'low'):
+            return jsonify({'error': 'level must be one of critical, high, medium, low'}), 400
+        try:
+            limit = read_limit(request.args, default=100)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        students = ml_service.get_students_by_risk(level, limit=limit)
+        return jsonify(students), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/models', methods=['GET'])
+def list_models():
+    """Registered model versions, newest first, with the promotion history"""
+    try:
+        return jsonify(ml_service.list_models()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/models/<version>', methods=['GET'])
+def get_model_version(version):
+    """Metrics, features and training details of one model version"""
+    try:
+        model = ml_service.get_model_version(version)
+        if not model:
+            return jsonify({'error': 'Model version not found'}), 404
+        return jsonify(model), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/models/<version>/promote', methods=['POST'])
+def promote_model(version):
+    """Serve a model version; every worker switches within the reload interval"""
+    try:
+        if not ml_service.get_model_version(version):
+            return jsonify({'error': 'Model version not found'}), 404
+        result = ml_service.promote_model(version)
+        return jsonify(result), 200 if result.get('success') else 500
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/models/rollback', methods=['POST'])
+def rollback_model():
+    """Serve the previously promoted model version again"""
+    try:
+        result = ml_service.rollback_model()
+        return jsonify(result), 200 if result.get('success') else 409
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
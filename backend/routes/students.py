@@ -2,30 +2,81 @@
 API routes for student data
 """
 
-from flask import Blueprint, jsonify, request
-from services.data_service import DataService
+from flask import Blueprint, Response, current_app, jsonify, request
+from services.container import services
+from services.cache import result_cache
+from services.pagination import read_cursor, read_page_args
+from services.projections import parse_fields
+from services.export import EXPORT_FORMATS, ndjson_chunks, csv_chunks, gzip_chunks
 
 bp = Blueprint('students', __name__)
-data_service = DataService()
+data_service = services.data_service
 
 @bp.route('/', methods=['GET'])
 def get_students():
     """Get list of students with optional filtering"""
     try:
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 200))
         search = request.args.get('search', '')
+        include_total = request.args.get('total', 'true').lower() == 'true'
         
-        students = data_service.get_students(page=page, limit=limit, search=search)
+        try:
+            page, limit = read_page_args(request.args)
+            cursor = read_cursor(request.args.get('cursor'), search)
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        students = data_service.get_students(
+            page=page, limit=limit, search=search, cursor=cursor,
+            include_total=include_total, fields=fields
+        )
         return jsonify(students), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/export', methods=['GET'])
+def export_students():
+    """Stream every student as NDJSON or CSV, optionally gzipped"""
+    try:
+        export_format = request.args.get('format', 'ndjson').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        compress = request.args.get('gzip', 'false').lower() == 'true'
+        
+        students = data_service.iter_students(fields=fields)
+        if export_format == 'csv':
+            chunks = csv_chunks(students, fields)
+        else:
+            chunks = ndjson_chunks(students, current_app.json.dumps_bytes)
+        
+        filename = f'students.{export_format}'
+        mimetype = EXPORT_FORMATS[export_format]
+        if compress:
+            chunks = gzip_chunks(chunks)
+            filename += '.gz'
+            mimetype = 'application/gzip'
+        
+        return Response(
+            chunks, mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @bp.route('/<student_id>', methods=['GET'])
 def get_student(student_id):
     """Get a specific student by ID"""
     try:
-        student = data_service.get_student_by_id(student_id)
+        try:
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        student = data_service.get_student_by_id(student_id, fields=fields)
         if not student:
             return jsonify({'error': 'Student not found'}), 404
         return jsonify(student), 200
@@ -36,7 +87,12 @@ def get_student(student_id):
 def get_student_stats():
     """Get overall student statistics"""
     try:
-        stats = data_service.get_student_stats()
+        percentiles = request.args.get('percentiles', 'false').lower() == 'true'
+        
+        stats = result_cache.get_or_compute(
+            'students.stats', {'percentiles': percentiles},
+            lambda: data_service.get_student_stats(with_percentiles=percentiles)
+        )
         return jsonify(stats), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -3,19 +3,21 @@ API routes for learning trends and analytics
 """
 
 from flask import Blueprint, jsonify, request
-from services.data_service import DataService
-from services.trends_service import TrendsService
+from services.container import services
+from services.cache import result_cache
 
 bp = Blueprint('trends', __name__)
-data_service = DataService()
-trends_service = TrendsService()
+data_service = services.data_service
+trends_service = services.trends_service
 
 @bp.route('/completion', methods=['GET'])
 def get_completion_trends():
     """Get learning completion trends"""
     try:
         period = request.args.get('period', 'all')  # all, week, month, year
-        trends = trends_service.get_completion_trends(period)
+        trends = result_cache.get_or_compute(
+            'trends.completion', {'period': period}, lambda: trends_service.get_completion_trends(period)
+        )
         return jsonify(trends), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -25,7 +27,9 @@ def get_score_trends():
     """Get average score trends"""
     try:
         period = request.args.get('period', 'all')
-        trends = trends_service.get_score_trends(period)
+        trends = result_cache.get_or_compute(
+            'trends.scores', {'period': period}, lambda: trends_service.get_score_trends(period)
+        )
         return jsonify(trends), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -35,7 +39,9 @@ def get_dropout_trends():
     """Get dropout rate trends"""
     try:
         period = request.args.get('period', 'all')
-        trends = trends_service.get_dropout_trends(period)
+        trends = result_cache.get_or_compute(
+            'trends.dropout', {'period': period}, lambda: trends_service.get_dropout_trends(period)
+        )
         return jsonify(trends), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -45,7 +51,9 @@ def get_engagement_trends():
     """Get engagement trends over time"""
     try:
         period = request.args.get('period', 'all')
-        trends = trends_service.get_engagement_trends(period)
+        trends = result_cache.get_or_compute(
+            'trends.engagement', {'period': period}, lambda: trends_service.get_engagement_trends(period)
+        )
         return jsonify(trends), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -55,7 +63,9 @@ def get_all_trends():
     """Get all trends in one response"""
     try:
         period = request.args.get('period', 'all')
-        all_trends = trends_service.get_all_trends(period)
+        all_trends = result_cache.get_or_compute(
+            'trends.all', {'period': period}, lambda: trends_service.get_all_trends(period)
+        )
         return jsonify(all_trends), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
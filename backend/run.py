@@ -1,6 +1,7 @@
 """
 Data Pipeline CLI - Orchestrates the data processing pipeline
 Run all steps: python run.py
+Stream all steps in chunks: python run.py --stream
 """
 
 import os
@@ -11,22 +12,64 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from scripts.clean_data import clean
 from scripts.generate_features import generate_features
-from scripts.insert_data import insert_data
+from scripts.insert_data import insert_data, rollback_data
+from scripts.stream_pipeline import CHUNK_ROWS, PIPELINE_WORKERS, stream_pipeline
+from scripts.bulk_loader import LOAD_BATCH_SIZE, LOAD_WORKERS
 
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(description='Lernexa AI Data Pipeline')
-    parser.add_argument(
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
         '--step',
         type=int,
         choices=[1, 2, 3],
         help='Run specific step: 1=clean, 2=features, 3=insert'
     )
-    parser.add_argument(
+    mode.add_argument(
         '--all',
         action='store_true',
         help='Run all steps sequentially'
     )
+    mode.add_argument(
+        '--stream',
+        action='store_true',
+        help='Run all steps chunk by chunk, without intermediate files'
+    )
+    mode.add_argument(
+        '--rollback',
+        action='store_true',
+        help='Restore the students data replaced by the last insert'
+    )
+    parser.add_argument(
+        '--chunk-rows',
+        type=int,
+        default=CHUNK_ROWS,
+        help=f'Rows per chunk for --stream (default {CHUNK_ROWS})'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=PIPELINE_WORKERS,
+        help=f'Processes cleaning and generating features for --stream (default {PIPELINE_WORKERS})'
+    )
+    parser.add_argument(
+        '--refresh-stats',
+        action='store_true',
+        help='Rescan the raw data for --stream even if the saved statistics are current'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=LOAD_BATCH_SIZE,
+        help=f'Documents per bulk write when inserting (default {LOAD_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--load-workers',
+        type=int,
+        default=LOAD_WORKERS,
+        help=f'Concurrent bulk writers when inserting (default {LOAD_WORKERS})'
+    )
     
     args = parser.parse_args()
     
@@ -35,17 +78,29 @@ def main():
     print("=" * 60)
     print()
     
-    if not args.step and not args.all:
+    step = args.step
+    
+    if args.rollback:
+        print("Rolling back the last data load")
+        print("=" * 60)
+        if not rollback_data():
+            print("\n❌ Rollback failed.")
+            sys.exit(1)
+        print("\n✅ Rollback completed")
+        sys.exit(0)
+    
+    if not args.step and not args.all and not args.stream:
         print("Select an option:")
         print("1. Clean raw data")
         print("2. Generate features")
         print("3. Insert data to MongoDB")
         print("4. Run all steps (1, 2, 3)")
+        print("5. Stream all steps in chunks")
         print("0. Exit")
         print()
         
         try:
-            choice = input("Enter your choice (0-4): ").strip()
+            choice = input("Enter your choice (0-5): ").strip()
         except KeyboardInterrupt:
             print("\n\n❌ Cancelled by user")
             sys.exit(1)
@@ -61,14 +116,30 @@ def main():
             step = 3
         elif choice == '4':
             args.all = True
+        elif choice == '5':
+            args.stream = True
         else:
             print("❌ Invalid choice")
             sys.exit(1)
-    else:
-        step = args.step
     
     success = True
     
+    if args.stream:
+        print("\n" + "=" * 60)
+        print("Streaming pipeline: clean, features and insert")
+        print("=" * 60)
+        success = stream_pipeline(
+            chunk_rows=args.chunk_rows,
+            workers=args.workers,
+            refresh_stats=args.refresh_stats,
+            batch_size=args.batch_size,
+            load_workers=args.load_workers
+        )
+        if not success:
+            print("\n❌ Streaming pipeline failed.")
+            sys.exit(1)
+        print()
+    
     if args.all or step == 1:
         print("\n" + "=" * 60)
         print("STEP 1: Cleaning raw data")
@@ -93,7 +164,7 @@ def main():
         print("\n" + "=" * 60)
         print("STEP 3: Inserting data to MongoDB")
         print("=" * 60)
-        success = insert_data()
+        success = insert_data(args.batch_size, args.load_workers)
         if not success:
             print("\n❌ Step 3 failed. Aborting pipeline.")
             sys.exit(1)
@@ -105,6 +176,8 @@ def main():
         print("=" * 60)
         print("\nYou can now start the API server with:")
         print("  python app.py")
-        print()if __name__ == "__main__":
+        print()
+
+if __name__ == "__main__":
     main()
 
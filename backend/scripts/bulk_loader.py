@@ -0,0 +1,148 @@
+"""
+Parallel bulk loader for the students collection
+
+Documents are upserted with bulk_write(ReplaceOne(..., upsert=True)) keyed by
+StudentID, in batches written by a pool of threads (PyMongo clients are
+thread-safe and release the GIL while waiting on the server). Because an upsert
+can be repeated safely, a batch that fails is split in half and each half
+retried, down to the single documents that actually fail, instead of being
+retried one insert_one at a time.
+"""
+
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import ReplaceOne
+from pymongo.errors import ConnectionFailure
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.indexes import STUDENT_INDEXES, ensure_indexes
+
+UPSERT_KEY = 'StudentID'
+
+LOAD_BATCH_SIZE = int(os.getenv('LOAD_BATCH_SIZE', 1000))
+LOAD_WORKERS = int(os.getenv('LOAD_WORKERS', 4))
+
+# Upserts look documents up by UPSERT_KEY, so its index must exist before loading
+UPSERT_INDEXES = [spec for spec in STUDENT_INDEXES if spec['keys'] == [(UPSERT_KEY, 1)]]
+
+
+class BulkLoader:
+    """Upsert documents in batches from a pool of worker threads
+
+    Use as a context manager; load() may be called any number of times, and
+    report() summarizes the whole run once the block exits.
+    """
+
+    def __init__(self, collection, batch_size=LOAD_BATCH_SIZE, workers=LOAD_WORKERS):
+        self.collection = collection
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self.pool = None
+        self.pending = deque()
+        self.written = 0
+        self.upserted = 0
+        self.batches = 0
+        self.bisections = 0
+        self.failed = []
+        self.started = None
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        ensure_indexes(self.collection, UPSERT_INDEXES)
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        self.started = time.time()
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            while self.pending:
+                self._collect(self.pending.popleft())
+        finally:
+            self.pool.shutdown(wait=True)
+            self.elapsed = time.time() - self.started
+        return False
+
+    def load(self, records):
+        """Queue records for writing; blocks while 2 * workers batches are in flight"""
+        for i in range(0, len(records), self.batch_size):
+            batch = []
+            for record in records[i:i + self.batch_size]:
+                if record.get(UPSERT_KEY) is None:
+                    self.failed.append({'key': None, 'error': f'Missing {UPSERT_KEY}'})
+                else:
+                    batch.append(record)
+            if not batch:
+                continue
+            self.pending.append(self.pool.submit(self._write, batch))
+            if len(self.pending) >= 2 * self.workers:
+                self._collect(self.pending.popleft())
+
+    def _collect(self, future):
+        result = future.result()
+        self.batches += 1
+        self.written += result['written']
+        self.upserted += result['upserted']
+        self.bisections += result['bisections']
+        self.failed.extend(result['failed'])
+
+    def _write(self, batch):
+        """Write one batch, bisecting it on failure; returns counts for the batch"""
+        requests = [ReplaceOne({UPSERT_KEY: record[UPSERT_KEY]}, record, upsert=True) for record in batch]
+        try:
+            result = self.collection.bulk_write(requests, ordered=False)
+            return {
+                'written': result.matched_count + result.upserted_count,
+                'upserted': result.upserted_count,
+                'bisections': 0,
+                'failed': []
+            }
+        except ConnectionFailure:
+            # Splitting the batch cannot help when the server is unreachable
+            raise
+        except Exception as e:
+            if len(batch) == 1:
+                return {
+                    'written': 0,
+                    'upserted': 0,
+                    'bisections': 0,
+                    'failed': [{'key': batch[0][UPSERT_KEY], 'error': str(e)}]
+                }
+            middle = len(batch) // 2
+            left = self._write(batch[:middle])
+            right = self._write(batch[middle:])
+            return {
+                'written': left['written'] + right['written'],
+                'upserted': left['upserted'] + right['upserted'],
+                'bisections': 1 + left['bisections'] + right['bisections'],
+                'failed': left['failed'] + right['failed']
+            }
+
+    def report(self):
+        return {
+            'written': self.written,
+            'upserted': self.upserted,
+            'failed': len(self.failed),
+            'failures': self.failed[:20],
+            'batches': self.batches,
+            'bisections': self.bisections,
+            'batch_size': self.batch_size,
+            'workers': self.workers,
+            'seconds': round(self.elapsed, 3),
+            'docs_per_second': round(self.written / self.elapsed, 1) if self.elapsed else None
+        }
+
+
+def print_load_report(report):
+    print(f"\nWrote {report['written']} records ({report['upserted']} new) in {report['seconds']}s")
+    print(f"   - {report['docs_per_second']} docs/sec with {report['workers']} workers, "
+          f"batches of {report['batch_size']}")
+    if report['bisections']:
+        print(f"   - Split failing batches {report['bisections']} times")
+    for failure in report['failures']:
+        print(f"   - Failed {failure['key']}: {failure['error']}")
+    if report['failed'] > len(report['failures']):
+        print(f"   - ... and {report['failed'] - len(report['failures'])} more failures")
@@ -7,6 +7,18 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 RAW_DATA_PATH = "datasets/raw/student_performance.csv"
 CLEANED_PATH = "datasets/processed/cleaned_student_data.csv"
 
+NUMERIC_DTYPES = ['float64', 'int64']
+
+def fill_missing(df, fills):
+    """Fill NaNs in place with fills[column] (median or mode); returns {column: count filled}"""
+    filled = {}
+    for column, value in fills.items():
+        missing_count = df[column].isna().sum()
+        if missing_count > 0:
+            df[column] = df[column].fillna(value)
+            filled[column] = missing_count
+    return filled
+
 def clean():
     print("📂 Loading dataset...")
 
@@ -26,20 +38,19 @@ def clean():
         if duplicates_removed > 0:
             print(f"   - Removed {duplicates_removed} duplicate records")
         
-        numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns
+        fills = {}
+        numeric_cols = df.select_dtypes(include=NUMERIC_DTYPES).columns
         for column in numeric_cols:
-            missing_count = df[column].isna().sum()
-            if missing_count > 0:
-                df[column] = df[column].fillna(df[column].median())
-                print(f"   - Filled {missing_count} missing values in '{column}' with median")
+            fills[column] = df[column].median()
         
         categorical_cols = df.select_dtypes(include=['object']).columns
         for column in categorical_cols:
-            missing_count = df[column].isna().sum()
-            if missing_count > 0:
-                mode_value = df[column].mode()[0] if len(df[column].mode()) > 0 else ''
-                df[column] = df[column].fillna(mode_value)
-                print(f"   - Filled {missing_count} missing values in '{column}' with mode")
+            mode = df[column].mode()
+            fills[column] = mode[0] if len(mode) > 0 else ''
+
+        for column, missing_count in fill_missing(df, fills).items():
+            method = 'median' if column in numeric_cols else 'mode'
+            print(f"   - Filled {missing_count} missing values in '{column}' with {method}")
 
         os.makedirs(os.path.dirname(CLEANED_PATH), exist_ok=True)
         
@@ -0,0 +1,72 @@
+"""
+Staged reloads of the students collection
+
+A reload writes into students_staging and indexes it while the API keeps
+reading the current students collection. swap_in then replaces students with
+one renameCollection(dropTarget=True), so readers see either the old cohort or
+the new one, never an empty or half-loaded collection.
+
+With LOAD_KEEP_PREVIOUS=true the outgoing cohort is first copied server-side
+($out) to students_previous while students keeps serving, and the swap is still
+the one rename; rollback renames the copy back the same way. The copy costs a
+pass over the cohort on every load, so it is off by default. If the swap itself
+fails and leaves no students collection, students_previous is put back.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.indexes import ensure_indexes
+
+STUDENTS_COLLECTION = 'students'
+STAGING_COLLECTION = 'students_staging'
+PREVIOUS_COLLECTION = 'students_previous'
+
+KEEP_PREVIOUS = os.getenv('LOAD_KEEP_PREVIOUS', 'false').lower() == 'true'
+
+
+def prepare_staging(db):
+    """An empty staging collection (left over staging data is dropped)"""
+    db.drop_collection(STAGING_COLLECTION)
+    return db[STAGING_COLLECTION]
+
+
+def swap_in(db, keep_previous=KEEP_PREVIOUS):
+    """Make the staging collection the students collection; returns whether a previous copy was kept"""
+    kept = False
+    if keep_previous and STUDENTS_COLLECTION in db.list_collection_names():
+        # Copied before the swap, so readers never see a missing students collection
+        db[STUDENTS_COLLECTION].aggregate([{'$match': {}}, {'$out': PREVIOUS_COLLECTION}])
+        kept = True
+    else:
+        # A copy from an older load is not the cohort this one replaces
+        db.drop_collection(PREVIOUS_COLLECTION)
+    try:
+        db[STAGING_COLLECTION].rename(STUDENTS_COLLECTION, dropTarget=True)
+    except Exception:
+        _restore_students(db)
+        raise
+    return kept
+
+
+def _restore_students(db):
+    """Put students_previous back if a failed swap left no students collection"""
+    names = db.list_collection_names()
+    if STUDENTS_COLLECTION in names or PREVIOUS_COLLECTION not in names:
+        return
+    previous = db[PREVIOUS_COLLECTION]
+    ensure_indexes(previous)
+    previous.rename(STUDENTS_COLLECTION)
+
+
+def rollback(db):
+    """Restore the cohort saved by the last swap_in; returns False if there is none"""
+    if PREVIOUS_COLLECTION not in db.list_collection_names():
+        return False
+    previous = db[PREVIOUS_COLLECTION]
+    # $out does not carry indexes, so build them before it goes live
+    ensure_indexes(previous)
+    previous.rename(STUDENTS_COLLECTION, dropTarget=True)
+    return True
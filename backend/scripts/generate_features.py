@@ -12,6 +12,71 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 CLEANED_PATH = "datasets/processed/cleaned_student_data.csv"
 FEATURE_PATH = "datasets/features/student_features.csv"
 
+# Columns normalized by their dataset-wide maximum
+MAXIMA_COLUMNS = ["StudyHours", "AssignmentCompletion", "Discussions", "Resources", "ExamScore", "Attendance"]
+
+FEATURE_COLUMNS = [
+    "EngagementScore", "Consistency", "StressImpact", "TechScore", "ResourceUsage",
+    "StudyEfficiency", "AttendanceImpact", "RiskScore"
+]
+
+def feature_maxima(df):
+    """Maximum of each MAXIMA_COLUMNS column over the whole dataset"""
+    return {column: df[column].max() for column in MAXIMA_COLUMNS}
+
+def add_features(df, maxima, first_index=0):
+    """Add identity and computed feature columns to df
+    
+    maxima comes from feature_maxima over the whole dataset, so a chunk of rows gets
+    the same features as it would in the full frame. first_index is the position of
+    the chunk's first row, used to number StudentID and Name.
+    """
+    max_study_hours = max(maxima["StudyHours"], 1)
+    max_assignment = max(maxima["AssignmentCompletion"], 1)
+    max_discussions = max(maxima["Discussions"], 1)
+    max_resources = max(maxima["Resources"], 1)
+
+    positions = range(first_index, first_index + len(df))
+    if 'StudentID' not in df.columns:
+        df['StudentID'] = [f"STU{i+1:04d}" for i in positions]
+    if 'Name' not in df.columns:
+        df['Name'] = [f"Student {i+1}" for i in positions]
+
+    df["EngagementScore"] = (
+        (df["StudyHours"] / max_study_hours) * 30 +
+        (df["Attendance"] / 100) * 20 +
+        (df["AssignmentCompletion"] / max_assignment) * 20 +
+        (df["Discussions"] / max_discussions) * 20 +
+        (df["Resources"] / max_resources) * 10
+    )
+
+    df["Consistency"] = df["StudyHours"] / df["Attendance"].replace(0, 1)
+
+    df["StressImpact"] = df["StressLevel"] / df["StudyHours"].replace(0, 1)
+
+    df["TechScore"] = (
+        df["Internet"] * 0.3 +
+        df["EduTech"] * 0.4 +
+        df["OnlineCourses"] * 0.3
+    )
+
+    df["ResourceUsage"] = (
+        df["Resources"] + df["Discussions"] + df["AssignmentCompletion"]
+    ) / 3
+
+    df["StudyEfficiency"] = df["ExamScore"] / df["StudyHours"].replace(0, 1)
+
+    df["AttendanceImpact"] = df["FinalGrade"] / df["Attendance"].replace(0, 1)
+
+    df["RiskScore"] = (
+        (100 - df["EngagementScore"]) * 0.4 +
+        df["StressLevel"] * 0.4 +
+        (100 - df["Attendance"]) * 0.2
+    )
+    df["RiskScore"] = df["RiskScore"].clip(0, 100)
+
+    return df
+
 def generate_features():
     """Generate computed features from cleaned data"""
     print("📂 Loading cleaned data...")
@@ -25,64 +90,18 @@ def generate_features():
         df = pd.read_csv(CLEANED_PATH)
         print(f"Loaded {len(df)} records")
         
-        max_study_hours = max(df["StudyHours"].max(), 1)
-        max_assignment = max(df["AssignmentCompletion"].max(), 1)
-        max_discussions = max(df["Discussions"].max(), 1)
-        max_resources = max(df["Resources"].max(), 1)
-        max_exam_score = max(df["ExamScore"].max(), 1)
-        max_attendance = max(df["Attendance"].max(), 1)
+        maxima = feature_maxima(df)
         
         print("\nGenerating new feature columns...")
 
         if 'StudentID' not in df.columns:
-            df['StudentID'] = [f"STU{i+1:04d}" for i in range(len(df))]
             print("   - Added StudentID column")
-
         if 'Name' not in df.columns:
-            df['Name'] = [f"Student {i+1}" for i in range(len(df))]
             print("   - Added Name column")
 
-        df["EngagementScore"] = (
-            (df["StudyHours"] / max_study_hours) * 30 +
-            (df["Attendance"] / 100) * 20 +
-            (df["AssignmentCompletion"] / max_assignment) * 20 +
-            (df["Discussions"] / max_discussions) * 20 +
-            (df["Resources"] / max_resources) * 10
-        )
-        print("   - Generated EngagementScore")
-
-        df["Consistency"] = df["StudyHours"] / df["Attendance"].replace(0, 1)
-        print("   - Generated Consistency")
-
-        df["StressImpact"] = df["StressLevel"] / df["StudyHours"].replace(0, 1)
-        print("   - Generated StressImpact")
-
-        df["TechScore"] = (
-            df["Internet"] * 0.3 +
-            df["EduTech"] * 0.4 +
-            df["OnlineCourses"] * 0.3
-        )
-        print("   - Generated TechScore")
-
-        df["ResourceUsage"] = (
-            df["Resources"] + df["Discussions"] + df["AssignmentCompletion"]
-        ) / 3
-        print("   - Generated ResourceUsage")
-
-        df["StudyEfficiency"] = df["ExamScore"] / df["StudyHours"].replace(0, 1)
-        print("   - Generated StudyEfficiency")
-
-        df["AttendanceImpact"] = df["FinalGrade"] / df["Attendance"].replace(0, 1)
-        print("   - Generated AttendanceImpact")
-
-        df["RiskScore"] = (
-            (100 - df["EngagementScore"]) * 0.4 +
-            df["StressLevel"] * 0.4 +
-            (100 - df["Attendance"]) * 0.2
-        )
-
-        df["RiskScore"] = df["RiskScore"].clip(0, 100)
-        print("   - Generated RiskScore")
+        df = add_features(df, maxima)
+        for column in FEATURE_COLUMNS:
+            print(f"   - Generated {column}")
 
         os.makedirs(os.path.dirname(FEATURE_PATH), exist_ok=True)
         
@@ -6,12 +6,55 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.database import db_config
+from services.cache import bump_dataset_version
+from services.indexes import ensure_indexes
+from services.search import SEARCH_KEYS_FIELD, search_keys
+from scripts.bulk_loader import LOAD_BATCH_SIZE, LOAD_WORKERS, BulkLoader, print_load_report
+from scripts.collection_swap import (
+    STUDENTS_COLLECTION, STAGING_COLLECTION, PREVIOUS_COLLECTION, prepare_staging, swap_in, rollback
+)
 
 load_dotenv()
 
 FEATURE_PATH = "datasets/features/student_features.csv"
 
-def insert_data():
+def to_records(df):
+    """Documents for the rows of df, with NaN as None and search keys added"""
+    records = df.astype(object).where(df.notna(), None).to_dict('records')
+    for record in records:
+        record[SEARCH_KEYS_FIELD] = search_keys(record)
+    return records
+
+def refresh_derived_data():
+    """Invalidate cached results and rescore the cohort after the students collection changes"""
+    version = bump_dataset_version(db_config.db)
+    print(f"Dataset version: {version}")
+    
+    print("\nMaterializing prediction scores...")
+    from services.ml_service import MLService
+    result = MLService().materialize_scores()
+    if result.get('success'):
+        print(f"   - Scored {result['scored_students']} students")
+    else:
+        print(f"   - Skipped: {result.get('message')}")
+
+def finalize_load(staging):
+    """Index the loaded staging collection, swap it in as students, then version and score"""
+    print("\nEnsuring indexes...")
+    report = ensure_indexes(staging)
+    for name in report['created'] + report['rebuilt']:
+        print(f"   - Created {name}")
+    for name, error in report['failed'].items():
+        print(f"   - Failed {name}: {error}")
+    
+    print("\nSwapping in the new data...")
+    if swap_in(db_config.db):
+        print(f"   - Saved the replaced data as '{PREVIOUS_COLLECTION}' (python run.py --rollback)")
+    print(f"   - '{STAGING_COLLECTION}' is now '{STUDENTS_COLLECTION}'")
+    
+    refresh_derived_data()
+
+def insert_data(batch_size=LOAD_BATCH_SIZE, workers=LOAD_WORKERS):
     """Insert processed student data into MongoDB"""
     print("Loading feature dataset...")
 
@@ -31,50 +74,47 @@ def insert_data():
         
         print(f"Connected to database: {db_config.database_name}")
         
-        collection = db_config.get_collection('students')
-        if collection is None:
-            print("Failed to get students collection")
-            return False
-        
-        print("\nClearing existing data...")
-        result = collection.delete_many({})
-        print(f"   - Deleted {result.deleted_count} existing records")
+        staging = prepare_staging(db_config.db)
         
-        print("\nInserting data into MongoDB...")
-
-        records = df.to_dict('records')
+        print(f"\nInserting data into '{STAGING_COLLECTION}'...")
 
-        for record in records:
-            for key, value in record.items():
-                if pd.isna(value):
-                    record[key] = None
+        with BulkLoader(staging, batch_size, workers) as loader:
+            loader.load(to_records(df))
+        print_load_report(loader.report())
+        print(f"Total staged: {staging.count_documents({})}")
         
-        batch_size = 1000
-        total_inserted = 0
+        finalize_load(staging)
+        
+        db_config.close()
+        return True
         
-        for i in range(0, len(records), batch_size):
-            batch = records[i:i + batch_size]
-            try:
-                collection.insert_many(batch, ordered=False)
-                total_inserted += len(batch)
-                print(f"   - Inserted batch {i//batch_size + 1}: {len(batch)} records")
-            except Exception as e:
-                print(f"Error inserting batch {i//batch_size + 1}: {e}")
-                for record in batch:
-                    try:
-                        collection.insert_one(record)
-                        total_inserted += 1
-                    except:
-                        pass
+    except Exception as e:
+        print(f"\nError during data insertion: {e}")
+        db_config.close()
+        return False
+
+def rollback_data():
+    """Put back the students data replaced by the last load"""
+    print("🔌 Connecting to MongoDB...")
+    if not db_config.connect():
+        print("Failed to connect to MongoDB")
+        return False
+    
+    try:
+        if not rollback(db_config.db):
+            print(f"Nothing to roll back: '{PREVIOUS_COLLECTION}' does not exist")
+            db_config.close()
+            return False
+        print(f"Restored '{STUDENTS_COLLECTION}' from '{PREVIOUS_COLLECTION}'")
+        print(f"Total in DB: {db_config.db[STUDENTS_COLLECTION].count_documents({})}")
         
-        print(f"\nInserted {total_inserted} records")
-        print(f"Total in DB: {collection.count_documents({})}")
+        refresh_derived_data()
         
         db_config.close()
         return True
         
     except Exception as e:
-        print(f"\nError during data insertion: {e}")
+        print(f"\nError during rollback: {e}")
         db_config.close()
         return False
 
@@ -0,0 +1,281 @@
+"""
+Dataset-wide statistics for the streaming pipeline
+
+gather_stats makes one pass over the raw CSV and records everything the clean
+and feature steps need from the whole dataset: the duplicate count, the dtype
+each column gets in a full read, exact min/max per numeric column, median fill
+values for numeric columns and mode fill values for categorical ones.
+
+Medians are exact while a column has at most EXACT_DISTINCT_VALUES distinct
+values (true of every column in the bundled dataset), which keeps the streamed
+output identical to the in-memory path. Past that the column's counts are
+folded into a t-digest and its median is approximate. The result is saved as a
+JSON manifest next to the feature dataset and reused while the raw file's size
+and modification time are unchanged.
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import sys
+import json
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.clean_data import RAW_DATA_PATH, NUMERIC_DTYPES
+from scripts.generate_features import MAXIMA_COLUMNS
+
+STATS_MANIFEST_PATH = "datasets/features/stats_manifest.json"
+MANIFEST_VERSION = 1
+
+CHUNK_ROWS = int(os.getenv('PIPELINE_CHUNK_ROWS', 50000))
+
+# Columns with more distinct values than this switch from exact counts to a t-digest
+EXACT_DISTINCT_VALUES = int(os.getenv('PIPELINE_EXACT_DISTINCT_VALUES', 10000))
+
+
+class SeenRows:
+    """Hashes of the rows kept so far, for dropping duplicates across chunks
+
+    The hashes are kept as sorted runs, newest last, each less than half the
+    size of the one before it. A chunk's new hashes form a run that is merged
+    with its neighbour until that holds, like carries in a binary counter, so
+    there are O(log chunks) runs to search and each hash is re-sorted
+    O(log chunks) times over the whole pass rather than once per chunk.
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def keep(self, chunk):
+        """Mask of the rows in chunk not seen before (first occurrence wins)"""
+        hashes = row_hashes(chunk)
+        mask = ~pd.Series(hashes).duplicated().to_numpy()
+        for run in self.runs:
+            positions = np.searchsorted(run, hashes)
+            positions[positions == len(run)] = 0
+            mask &= run[positions] != hashes
+        
+        run = np.sort(hashes[mask])
+        while self.runs and len(self.runs[-1]) <= 2 * len(run):
+            run = np.sort(np.concatenate([self.runs.pop(), run]), kind='stable')
+        if len(run):
+            self.runs.append(run)
+        return mask
+
+
+def row_hashes(chunk):
+    """64-bit hash per row; numbers hash alike whether a chunk read them as int or float"""
+    normalized = chunk.copy()
+    for column in chunk.select_dtypes(include=NUMERIC_DTYPES).columns:
+        normalized[column] = normalized[column].astype('float64')
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def read_chunks(path, chunk_rows, dtype=None):
+    return pd.read_csv(path, chunksize=chunk_rows, dtype=dtype)
+
+
+class TDigest:
+    """Merging t-digest: a few hundred weighted centroids approximating a distribution
+
+    Centroids are kept sorted; each update merges the new points in and
+    recompresses so that no centroid spans more than one unit of the k1 scale,
+    which keeps them small near the tails and around compression / 2 in total.
+    """
+
+    def __init__(self, compression=1000):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+
+    def update(self, values, weights=None):
+        values = np.asarray(values, dtype='float64')
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype='float64')
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='stable')
+        self.means, self.weights = self._compress(means[order], weights[order])
+
+    def _compress(self, means, weights):
+        if len(means) <= 1:
+            return means, weights
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        groups = np.floor(k)
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        merged_weights = np.add.reduceat(weights, starts)
+        merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+        return merged_means, merged_weights
+
+    def quantile(self, q):
+        if len(self.means) == 0:
+            return np.nan
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.weights.sum(), centers, self.means))
+
+
+class ColumnStats:
+    """Streaming statistics for one column of the deduplicated dataset"""
+
+    def __init__(self):
+        self.numeric = True
+        self.float = False
+        self.categorical = False
+        self.count = 0
+        self.missing = 0
+        self.min = np.nan
+        self.max = np.nan
+        self.counts = None
+        self.digest = None
+
+    def update(self, series, numeric, categorical):
+        self.numeric &= numeric
+        self.float |= series.dtype == 'float64'
+        self.categorical |= categorical
+        self.missing += int(series.isna().sum())
+        values = series.dropna()
+        self.count += len(values)
+        if numeric and len(values):
+            self.min = np.nanmin([self.min, values.min()])
+            self.max = np.nanmax([self.max, values.max()])
+
+        if self.digest is not None and numeric:
+            self.digest.update(values.to_numpy())
+            return
+        value_counts = values.value_counts()
+        self.counts = value_counts if self.counts is None else self.counts.add(value_counts, fill_value=0)
+        if self.numeric and len(self.counts) > EXACT_DISTINCT_VALUES:
+            self.digest = TDigest()
+            self.digest.update(self.counts.index.to_numpy(), self.counts.to_numpy())
+            self.counts = None
+
+    @property
+    def exact(self):
+        return self.digest is None
+
+    def median(self):
+        """Median as Series.median would give it, approximate once the column uses a t-digest"""
+        if self.digest is not None:
+            return self.digest.quantile(0.5)
+        total = int(self.counts.sum()) if self.counts is not None else 0
+        if total == 0:
+            return np.nan
+        counts = self.counts.sort_index()
+        cumulative = counts.cumsum().to_numpy()
+        values = counts.index.to_numpy()
+        low = values[np.searchsorted(cumulative, (total - 1) // 2 + 1)]
+        high = values[np.searchsorted(cumulative, total // 2 + 1)]
+        return (low + high) / 2
+
+    def mode(self):
+        """Most frequent value, the smallest one on ties (as Series.mode()[0])"""
+        if self.counts is None or self.counts.empty:
+            return ''
+        return min(self.counts.index[self.counts == self.counts.max()])
+
+
+def _plain(value):
+    """JSON-friendly form of a NumPy scalar"""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def gather_stats(path=RAW_DATA_PATH, chunk_rows=CHUNK_ROWS):
+    """One pass over the raw CSV: statistics of the cleaned dataset, as a manifest dict"""
+    started = time.time()
+    seen = SeenRows()
+    columns = {}
+    rows = 0
+    kept = 0
+
+    for chunk in read_chunks(path, chunk_rows):
+        rows += len(chunk)
+        chunk = chunk[seen.keep(chunk)]
+        kept += len(chunk)
+        numeric = set(chunk.select_dtypes(include=NUMERIC_DTYPES).columns)
+        categorical = set(chunk.select_dtypes(include=['object']).columns)
+        for column in chunk.columns:
+            columns.setdefault(column, ColumnStats()).update(
+                chunk[column], column in numeric, column in categorical
+            )
+
+    fills = {}
+    dtypes = {}
+    summary = {}
+    for column, stats in columns.items():
+        entry = {'missing': stats.missing}
+        if stats.numeric:
+            fills[column] = _plain(stats.median())
+            entry.update({
+                'min': _plain(stats.min),
+                'max': _plain(stats.max),
+                'median': fills[column],
+                'exact_median': stats.exact
+            })
+            if stats.float:
+                dtypes[column] = 'float64'
+        elif stats.categorical:
+            fills[column] = _plain(stats.mode())
+            entry['mode'] = fills[column]
+            dtypes[column] = 'str'
+        summary[column] = entry
+
+    source = os.stat(path)
+    return {
+        'version': MANIFEST_VERSION,
+        'source': {'path': path, 'size': source.st_size, 'mtime': source.st_mtime},
+        'rows': rows,
+        'duplicates': rows - kept,
+        'dtypes': dtypes,
+        'fills': fills,
+        'maxima': {column: summary.get(column, {}).get('max', np.nan) for column in MAXIMA_COLUMNS},
+        'columns': summary,
+        'elapsed_seconds': round(time.time() - started, 3)
+    }
+
+
+def read_dtypes(stats):
+    """read_csv dtype argument for the second pass"""
+    return {column: str if dtype == 'str' else dtype for column, dtype in stats['dtypes'].items()}
+
+
+def save_manifest(stats, manifest_path=STATS_MANIFEST_PATH):
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(stats, f, indent=2)
+    os.replace(temp_path, manifest_path)
+
+
+def load_manifest(path=RAW_DATA_PATH, manifest_path=STATS_MANIFEST_PATH):
+    """The saved manifest if it describes the current raw file, else None"""
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path) as f:
+            stats = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable stats manifest: {e}")
+        return None
+    source = os.stat(path)
+    expected = {'path': path, 'size': source.st_size, 'mtime': source.st_mtime}
+    if stats.get('version') != MANIFEST_VERSION or stats.get('source') != expected:
+        return None
+    return stats
+
+
+def load_or_gather_stats(path=RAW_DATA_PATH, chunk_rows=CHUNK_ROWS, refresh=False,
+                         manifest_path=STATS_MANIFEST_PATH):
+    """Statistics for path, from the manifest when it is current; returns (stats, reused)"""
+    if not refresh:
+        stats = load_manifest(path, manifest_path)
+        if stats is not None:
+            return stats, True
+    stats = gather_stats(path, chunk_rows)
+    save_manifest(stats, manifest_path)
+    return stats, False
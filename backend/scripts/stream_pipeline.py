@@ -0,0 +1,120 @@
+"""
+Streaming data pipeline: raw CSV to MongoDB in bounded memory
+
+Runs clean, generate_features and insert_data chunk by chunk, without writing
+or re-reading the intermediate CSVs. Duplicate removal, median/mode fills and
+the EngagementScore maxima are dataset-wide, so they come from a statistics
+pass (scripts/pipeline_stats.py, saved as a manifest) and a second pass cleans,
+derives features and inserts each chunk using them, optionally across worker
+processes. The documents inserted match what the three steps produce on the
+same file, unless a column had too many distinct values for an exact median.
+
+Memory is a few chunks, the statistics and 8 bytes per distinct row for
+duplicate detection.
+"""
+
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.database import db_config
+from scripts.clean_data import RAW_DATA_PATH, fill_missing
+from scripts.generate_features import add_features
+from scripts.insert_data import to_records, finalize_load
+from scripts.bulk_loader import LOAD_BATCH_SIZE, LOAD_WORKERS, BulkLoader, print_load_report
+from scripts.collection_swap import STAGING_COLLECTION, prepare_staging
+from scripts.pipeline_stats import (
+    CHUNK_ROWS, SeenRows, read_chunks, read_dtypes, load_or_gather_stats
+)
+
+PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', 1))
+
+
+def transform_chunk(chunk, fills, maxima, first_index):
+    """Clean and add features to one deduplicated chunk (runs in a worker process)"""
+    fill_missing(chunk, fills)
+    return add_features(chunk, maxima, first_index=first_index)
+
+
+def iter_feature_chunks(stats, path=RAW_DATA_PATH, chunk_rows=CHUNK_ROWS, workers=1):
+    """Second pass: yield each chunk deduplicated, filled and with features added, in file order
+
+    Duplicates are dropped here, in order, since that needs every earlier row.
+    The fill and feature work of up to 2 * workers chunks runs in a process pool.
+    """
+    seen = SeenRows()
+    kept = 0
+    chunks = read_chunks(path, chunk_rows, dtype=read_dtypes(stats))
+
+    if workers <= 1:
+        for chunk in chunks:
+            chunk = chunk[seen.keep(chunk)].reset_index(drop=True)
+            yield transform_chunk(chunk, stats['fills'], stats['maxima'], kept)
+            kept += len(chunk)
+        return
+
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunks:
+            chunk = chunk[seen.keep(chunk)].reset_index(drop=True)
+            pending.append(pool.submit(transform_chunk, chunk, stats['fills'], stats['maxima'], kept))
+            kept += len(chunk)
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def stream_pipeline(path=RAW_DATA_PATH, chunk_rows=CHUNK_ROWS, workers=PIPELINE_WORKERS,
+                    refresh_stats=False, batch_size=LOAD_BATCH_SIZE, load_workers=LOAD_WORKERS):
+    """Clean, generate features and insert the raw dataset chunk by chunk"""
+    print("📂 Scanning raw dataset...")
+
+    if not os.path.exists(path):
+        print(f"❌ Error: Raw data file not found at {path}")
+        return False
+
+    try:
+        stats, reused = load_or_gather_stats(path, chunk_rows, refresh=refresh_stats)
+        if reused:
+            print(f"Using saved statistics for {stats['rows']} records")
+        else:
+            print(f"Scanned {stats['rows']} records in {stats['elapsed_seconds']}s")
+        approximate = [c for c, entry in stats['columns'].items() if entry.get('exact_median') is False]
+        if approximate:
+            print(f"   - Approximate medians for: {', '.join(approximate)}")
+        if stats['duplicates'] > 0:
+            print(f"   - {stats['duplicates']} duplicate records will be skipped")
+
+        print("\n🔌 Connecting to MongoDB...")
+        if not db_config.connect():
+            print("Failed to connect to MongoDB")
+            return False
+
+        staging = prepare_staging(db_config.db)
+
+        print(f"\nCleaning, generating features and inserting into '{STAGING_COLLECTION}'...")
+        with BulkLoader(staging, batch_size, load_workers) as loader:
+            for chunk in iter_feature_chunks(stats, path, chunk_rows, workers):
+                loader.load(to_records(chunk))
+                print(f"   - Queued {len(chunk)} records ({loader.written} written so far)")
+        print_load_report(loader.report())
+        print(f"Total staged: {staging.count_documents({})}")
+
+        finalize_load(staging)
+
+        db_config.close()
+        return True
+
+    except Exception as e:
+        print(f"\nError during streaming pipeline: {e}")
+        db_config.close()
+        return False
+
+
+if __name__ == "__main__":
+    success = stream_pipeline()
+    sys.exit(0 if success else 1)
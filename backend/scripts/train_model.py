@@ -46,7 +46,8 @@ def main():
         for feat, imp in sorted_importance[:5]:
             print(f"  • {feat}: {imp*100:.2f}%")
         
-        print("\nModel saved to ./models/completion_model.pkl")
+        print(f"\nModel saved as version {result.get('model_version')} "
+              f"({'promoted' if result.get('promoted') else 'not promoted'})")
         print("="*60 + "\n")
         
     else:
@@ -0,0 +1,89 @@
+"""
+Vectorized cohort analytics over the column arrays of a CohortSnapshot
+
+Produces the same summary structure as the MongoDB aggregation in
+services.cohort_summary, using boolean masks and NumPy histograms instead
+of per-student Python loops.
+"""
+
+import numpy as np
+from services.cohort_summary import (
+    SUMMARY_FIELDS, MEDIAN_FIELDS, RANGE_FIELDS,
+    HEATMAP_ATTENDANCE_RANGES, HEATMAP_ENGAGEMENT_RANGES, empty_summary
+)
+
+# Grade bands for the score distribution; np.histogram closes the last bin so 100 counts as 90-100
+GRADE_BAND_EDGES = [60, 70, 80, 90, 100]
+ENGAGEMENT_LEVEL_EDGES = [50, 70]
+
+
+def _edges(ranges):
+    """Convert contiguous (low, high) ranges into histogram bin edges"""
+    return [low for low, _ in ranges] + [ranges[-1][1]]
+
+
+def _as_number(value):
+    """Convert a NumPy scalar to int when integral, float otherwise"""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def engagement_heatmap(attendance, engagement):
+    """Count students per attendance (rows) x engagement (columns) band"""
+    att_edges = _edges(HEATMAP_ATTENDANCE_RANGES)
+    eng_edges = _edges(HEATMAP_ENGAGEMENT_RANGES)
+    # Bands are half-open, so values equal to the top edge fall outside the grid
+    inside = (
+        (attendance >= att_edges[0]) & (attendance < att_edges[-1]) &
+        (engagement >= eng_edges[0]) & (engagement < eng_edges[-1])
+    )
+    counts, _, _ = np.histogram2d(attendance[inside], engagement[inside], bins=[att_edges, eng_edges])
+    return counts.astype(int).tolist()
+
+
+def summarize(snapshot):
+    """Compute the cohort summary from a CohortSnapshot in one vectorized pass"""
+    if not len(snapshot):
+        return empty_summary()
+    
+    final_grades = snapshot.column('FinalGrade')
+    risk_scores = snapshot.column('RiskScore')
+    attendance = snapshot.column('Attendance')
+    engagement = snapshot.column('EngagementScore')
+    
+    passing = final_grades >= 60
+    high_risk = risk_scores >= 70
+    
+    grade_bands, _ = np.histogram(final_grades, bins=GRADE_BAND_EDGES)
+    engagement_levels = np.bincount(
+        np.digitize(engagement, ENGAGEMENT_LEVEL_EDGES), minlength=len(ENGAGEMENT_LEVEL_EDGES) + 1
+    )
+    
+    counts = {
+        'grade_passing': passing.sum(),
+        'grade_excellent': (final_grades >= 80).sum(),
+        'grade_good': (passing & (final_grades < 80)).sum(),
+        'grade_needs_improvement': (~passing).sum(),
+        'grade_90_100': grade_bands[3],
+        'grade_80_89': grade_bands[2],
+        'grade_70_79': grade_bands[1],
+        'grade_60_69': grade_bands[0],
+        'grade_failing': (final_grades < 50).sum(),
+        'high_risk': high_risk.sum(),
+        'very_low_attendance': (attendance < 50).sum(),
+        'very_low_engagement': (engagement < 30).sum(),
+        'at_risk': (high_risk | ((attendance < 50) & (engagement < 40))).sum(),
+        'engagement_low': engagement_levels[0],
+        'engagement_medium': engagement_levels[1],
+        'engagement_high': engagement_levels[2],
+    }
+    
+    return {
+        'total': len(snapshot),
+        'averages': {field: float(snapshot.column(field).mean()) for field in SUMMARY_FIELDS},
+        'medians': {field: float(np.median(snapshot.column(field))) for field in MEDIAN_FIELDS},
+        'minimums': {field: _as_number(snapshot.column(field).min()) for field in RANGE_FIELDS},
+        'maximums': {field: _as_number(snapshot.column(field).max()) for field in RANGE_FIELDS},
+        'counts': {name: int(count) for name, count in counts.items()},
+        'heatmap': engagement_heatmap(attendance, engagement)
+    }
@@ -0,0 +1,150 @@
+"""
+Async data service for the async student endpoints
+
+Mirrors DataService on the async PyMongo driver. Queries that do not depend on
+each other run concurrently with asyncio.gather instead of one after another.
+
+This speeds up a single request (its queries overlap); it does not let a worker
+hold more requests in flight. Flask runs each async view on its own event loop
+inside a WSGI thread, so concurrency per worker is still GUNICORN_THREADS.
+"""
+
+import asyncio
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+from config.database import async_db_config
+from services.data_service import DataService
+from services.pagination import encode_cursor
+from services.projections import search_fields, trim_fields
+from services.search import (
+    SEARCH_CANDIDATE_LIMIT, SEARCH_MAX_TIME_MS,
+    build_search_queries, rank_matches
+)
+from services.student_stats import (
+    build_stats_pipeline, build_percentile_pipeline, stats_from_aggregation,
+    percentiles_from_aggregation, percentiles_from_fallback
+)
+
+class AsyncDataService:
+    """Async variant of DataService"""
+
+    _find_pipeline = staticmethod(DataService._find_pipeline)
+
+    @property
+    def collection(self):
+        return async_db_config.get_collection('students')
+
+    async def _find(self, match, fields=None, sort=None, skip=0, limit=None, **kwargs):
+        pipeline = self._find_pipeline(match, fields, sort, skip, limit)
+        cursor = await self.collection.aggregate(pipeline, **kwargs)
+        return await cursor.to_list(length=None)
+
+    async def get_student_by_id(self, student_id, fields=None):
+        """Get a student by ID (fields: list of fields to return, None for all)"""
+        try:
+            lookups = [self._find({'StudentID': str(student_id)}, fields, limit=1)]
+            if ObjectId.is_valid(student_id):
+                lookups.append(self._find({'_id': ObjectId(student_id)}, fields, limit=1))
+
+            # A StudentID match takes precedence over an _id match
+            for students in await asyncio.gather(*lookups):
+                if students:
+                    return students[0]
+            return None
+        except Exception as e:
+            print(f"Error fetching student: {e}")
+            return None
+
+    async def get_students(self, page=1, limit=200, search='', cursor=None, include_total=True, fields=None):
+        """Get a page of students (keyset on _id, see DataService.get_students)"""
+        try:
+            if build_search_queries(search):
+                return await self._search_students(search, page, limit, cursor, fields)
+
+            query = {}
+            if cursor:
+                query = {'_id': {'$gt': ObjectId(cursor['after'])}}
+            skip = (page - 1) * limit if not cursor and page > 1 else 0
+
+            # One extra document tells whether there is a next page
+            lookups = [self._find(query, fields, sort={'_id': 1}, skip=skip, limit=limit + 1)]
+            if include_total:
+                lookups.append(self.collection.estimated_document_count())
+            results = await asyncio.gather(*lookups)
+
+            students = results[0]
+            total = results[1] if include_total else None
+            has_more = len(students) > limit
+            students = students[:limit]
+
+            next_cursor = None
+            if has_more:
+                next_cursor = encode_cursor({'after': students[-1]['id']})
+
+            return {
+                'students': students,
+                'pagination': {
+                    'page': None if cursor else page,
+                    'limit': limit,
+                    'total': total,
+                    'pages': (total + limit - 1) // limit if total is not None else None,
+                    'next': next_cursor
+                }
+            }
+        except Exception as e:
+            print(f"Error fetching students: {e}")
+            return {'students': [], 'pagination': {'page': 1, 'limit': limit, 'total': 0, 'pages': 0, 'next': None}}
+
+    async def _search_students(self, search, page, limit, cursor=None, fields=None):
+        """Ranked prefix search, bounded by SEARCH_CANDIDATE_LIMIT matches"""
+        exact, prefix = await asyncio.gather(*[
+            self._find(
+                query, search_fields(fields), limit=SEARCH_CANDIDATE_LIMIT, maxTimeMS=SEARCH_MAX_TIME_MS
+            )
+            for query in build_search_queries(search)
+        ])
+
+        ranked = rank_matches(exact, prefix, search)
+        total = len(ranked)
+        skip = cursor['offset'] if cursor else (page - 1) * limit
+
+        return {
+            'students': [trim_fields(s, fields) for s in ranked[skip:skip + limit]],
+            'pagination': {
+                'page': None if cursor else page,
+                'limit': limit,
+                'total': total,
+                'pages': (total + limit - 1) // limit,
+                'next': encode_cursor({'offset': skip + limit}) if skip + limit < total else None,
+                'capped': len(prefix) >= SEARCH_CANDIDATE_LIMIT
+            }
+        }
+
+    async def _aggregate_one(self, pipeline):
+        cursor = await self.collection.aggregate(pipeline)
+        result = await cursor.to_list(length=1)
+        return result[0] if result else {}
+
+    async def get_student_stats(self, with_percentiles=False):
+        """Get overall student statistics"""
+        try:
+            try:
+                result = await self._aggregate_one(build_stats_pipeline(with_percentiles))
+                stats = stats_from_aggregation(result)
+                if with_percentiles:
+                    stats['percentiles'] = percentiles_from_aggregation(result)
+                return stats
+            except OperationFailure:
+                if not with_percentiles:
+                    raise
+                # $percentile needs MongoDB 7.0+, fall back to exact sort/skip percentiles
+                result = await self._aggregate_one(build_stats_pipeline())
+                stats = stats_from_aggregation(result)
+                pipeline = build_percentile_pipeline(result)
+                percentiles = await self._aggregate_one(pipeline) if pipeline else {}
+                stats['percentiles'] = percentiles_from_fallback(percentiles)
+                return stats
+        except Exception as e:
+            # Raised so result_cache does not keep zeros (see DataService.get_student_stats)
+            print(f"Error calculating stats: {e}")
+            raise
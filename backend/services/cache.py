@@ -0,0 +1,158 @@
+"""
+In-process result cache for the analytics endpoints
+
+Entries are keyed on endpoint, parameters and the dataset version. The data
+pipeline bumps the version in the metadata collection whenever it reloads the
+students collection, which invalidates every cached result in every worker.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pymongo import ReturnDocument
+from config.database import db_config
+
+METADATA_COLLECTION = 'metadata'
+DATASET_VERSION_ID = 'dataset_version'
+
+
+def bump_dataset_version(db):
+    """Increment the dataset version after the students collection changes"""
+    result = db[METADATA_COLLECTION].find_one_and_update(
+        {'_id': DATASET_VERSION_ID},
+        {'$inc': {'version': 1}, '$set': {'updated_at': datetime.now().isoformat()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return result['version']
+
+
+class DatasetVersion:
+    """Reads the dataset version, hitting MongoDB at most once per check interval"""
+    
+    def __init__(self, check_interval=5.0):
+        self.check_interval = check_interval
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+    
+    def current(self):
+        """Get the current dataset version (0 if it has never been set)"""
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < self.check_interval:
+            return self._version
+        
+        with self._lock:
+            if self._version is None or now - self._checked_at >= self.check_interval:
+                self._version = self._read()
+                self._checked_at = now
+        return self._version
+    
+    def _read(self):
+        try:
+            collection = db_config.get_collection(METADATA_COLLECTION)
+            if collection is None:
+                return 0
+            doc = collection.find_one({'_id': DATASET_VERSION_ID}, {'version': 1})
+            return doc.get('version', 0) if doc else 0
+        except Exception as e:
+            print(f"Error reading dataset version: {e}")
+            return self._version or 0
+
+
+class ResultCache:
+    """Bounded LRU cache with TTL and hit/miss counters"""
+    
+    def __init__(self, max_size=256, ttl=300.0, version_source=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.version_source = version_source or DatasetVersion()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def _make_key(self, endpoint, params):
+        version = self.version_source.current()
+        if version != self._version:
+            # Entries for older dataset versions can never be hit again
+            self.clear()
+            self._version = version
+        return (endpoint, tuple(sorted((params or {}).items())), version)
+    
+    def get_or_compute(self, endpoint, params, compute):
+        """Return the cached result for endpoint/params, computing it on a miss
+
+        If compute raises, the exception propagates and nothing is cached, so a
+        transient database error is retried on the next request.
+        """
+        key, entry = self._lookup(endpoint, params)
+        if entry is not None:
+            return entry[1]
+        value = compute()
+        self._store(key, value)
+        return value
+    
+    async def get_or_compute_async(self, endpoint, params, compute):
+        """get_or_compute for a coroutine function; shares entries with the sync endpoints"""
+        key, entry = self._lookup(endpoint, params)
+        if entry is not None:
+            return entry[1]
+        value = await compute()
+        self._store(key, value)
+        return value
+    
+    def _lookup(self, endpoint, params):
+        """(key, live entry or None), counting the hit or miss"""
+        key = self._make_key(endpoint, params)
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return key, entry
+            self.misses += 1
+            return key, None
+    
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Get cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0,
+                'dataset_version': self.version_source.current()
+            }
+
+
+dataset_version = DatasetVersion(float(os.getenv('DATASET_VERSION_CHECK_INTERVAL', 5)))
+
+result_cache = ResultCache(
+    max_size=int(os.getenv('RESULT_CACHE_SIZE', 256)),
+    ttl=float(os.getenv('RESULT_CACHE_TTL', 300)),
+    version_source=dataset_version
+)
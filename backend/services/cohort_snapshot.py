@@ -0,0 +1,45 @@
+"""
+Column-oriented snapshot of the student cohort for analytics
+"""
+
+import numpy as np
+
+class CohortSnapshot:
+    """Student fields stored as contiguous float64 arrays, fetched in a single scan"""
+    
+    def __init__(self, columns, size, ids=None):
+        self.columns = columns
+        self.size = size
+        self.ids = ids
+    
+    @classmethod
+    def from_documents(cls, documents, fields, id_field=None):
+        """Build a snapshot from an iterable of student documents"""
+        values = {field: [] for field in fields}
+        ids = [] if id_field else None
+        size = 0
+        for doc in documents:
+            for field in fields:
+                value = doc.get(field)
+                values[field].append(value if value is not None else 0)
+            if id_field:
+                ids.append(doc.get(id_field))
+            size += 1
+        columns = {
+            field: np.ascontiguousarray(values[field], dtype=np.float64)
+            for field in fields
+        }
+        return cls(columns, size, ids)
+    
+    def matrix(self, fields):
+        """Stack the given columns into an (n_students, n_fields) array"""
+        if not fields:
+            return np.zeros((self.size, 0))
+        return np.column_stack([self.columns[field] for field in fields])
+    
+    def column(self, field):
+        """Get all values of a field, in cohort order"""
+        return self.columns[field]
+    
+    def __len__(self):
+        return self.size
@@ -0,0 +1,163 @@
+"""
+Cohort-wide summary statistics shared by the trends and insights services
+
+The summary is computed inside MongoDB with a single aggregation so only a
+small result document leaves the database. services.analytics produces the
+same structure from an in-memory CohortSnapshot.
+"""
+
+SUMMARY_FIELDS = [
+    'FinalGrade', 'ExamScore', 'AssignmentCompletion', 'RiskScore',
+    'Attendance', 'EngagementScore', 'StudyHours'
+]
+
+MEDIAN_FIELDS = ['FinalGrade', 'ExamScore']
+RANGE_FIELDS = ['FinalGrade', 'ExamScore']
+
+# Rows of the engagement heatmap are attendance bands, columns engagement bands
+HEATMAP_ATTENDANCE_RANGES = [(0, 40), (40, 60), (60, 80), (80, 90), (90, 100)]
+HEATMAP_ENGAGEMENT_RANGES = [(0, 20), (20, 40), (40, 60), (60, 80), (80, 100)]
+
+
+def _between(field, low=None, high=None, inclusive_high=False):
+    """Aggregation expression for low <= field < high (either bound optional)"""
+    conditions = []
+    if low is not None:
+        conditions.append({'$gte': [f'${field}', low]})
+    if high is not None:
+        conditions.append({'$lte' if inclusive_high else '$lt': [f'${field}', high]})
+    return conditions[0] if len(conditions) == 1 else {'$and': conditions}
+
+
+# Named bucket counts: each maps to a boolean aggregation expression
+COUNT_EXPRESSIONS = {
+    'grade_passing': _between('FinalGrade', low=60),
+    'grade_excellent': _between('FinalGrade', low=80),
+    'grade_good': _between('FinalGrade', 60, 80),
+    'grade_needs_improvement': _between('FinalGrade', high=60),
+    'grade_90_100': _between('FinalGrade', 90, 100, inclusive_high=True),
+    'grade_80_89': _between('FinalGrade', 80, 90),
+    'grade_70_79': _between('FinalGrade', 70, 80),
+    'grade_60_69': _between('FinalGrade', 60, 70),
+    'grade_failing': _between('FinalGrade', high=50),
+    'high_risk': _between('RiskScore', low=70),
+    'very_low_attendance': _between('Attendance', high=50),
+    'very_low_engagement': _between('EngagementScore', high=30),
+    'at_risk': {'$or': [
+        _between('RiskScore', low=70),
+        {'$and': [_between('Attendance', high=50), _between('EngagementScore', high=40)]}
+    ]},
+    'engagement_high': _between('EngagementScore', low=70),
+    'engagement_medium': _between('EngagementScore', 50, 70),
+    'engagement_low': _between('EngagementScore', high=50),
+}
+
+
+def _band_index(field, ranges):
+    """Aggregation expression mapping a field to its band index (-1 if outside)"""
+    return {
+        '$switch': {
+            'branches': [
+                {'case': _between(field, low, high), 'then': i}
+                for i, (low, high) in enumerate(ranges)
+            ],
+            'default': -1
+        }
+    }
+
+
+def build_summary_pipeline():
+    """Build the $facet pipeline that computes the whole cohort summary except medians"""
+    totals = {'_id': None, 'total': {'$sum': 1}}
+    for field in SUMMARY_FIELDS:
+        totals[f'avg_{field}'] = {'$avg': f'${field}'}
+    for field in RANGE_FIELDS:
+        totals[f'min_{field}'] = {'$min': f'${field}'}
+        totals[f'max_{field}'] = {'$max': f'${field}'}
+    for name, expression in COUNT_EXPRESSIONS.items():
+        totals[f'count_{name}'] = {'$sum': {'$cond': [expression, 1, 0]}}
+    
+    return [
+        # Missing values count as 0, matching the per-document .get(field, 0)
+        {'$project': {'_id': 0, **{
+            field: {'$ifNull': [f'${field}', 0]} for field in SUMMARY_FIELDS
+        }}},
+        {'$facet': {
+            'totals': [{'$group': totals}],
+            'heatmap': [
+                {'$group': {
+                    '_id': {
+                        'attendance': _band_index('Attendance', HEATMAP_ATTENDANCE_RANGES),
+                        'engagement': _band_index('EngagementScore', HEATMAP_ENGAGEMENT_RANGES)
+                    },
+                    'count': {'$sum': 1}
+                }}
+            ]
+        }}
+    ]
+
+
+def build_median_pipeline(total):
+    """Exact medians via sort/skip (the middle value, or the mean of the two middle values)
+
+    $median only offers method 'approximate', which would change the dashboard's
+    medians depending on the server version, so medians always come from here.
+    """
+    facets = {}
+    for field in MEDIAN_FIELDS:
+        value = {'$ifNull': [f'${field}', 0]}
+        facets[field] = [
+            {'$project': {'_id': 0, 'value': value}},
+            {'$sort': {'value': 1}},
+            {'$skip': (total - 1) // 2},
+            {'$limit': 2 - total % 2}
+        ]
+    return [{'$facet': facets}]
+
+
+def summary_from_aggregation(result):
+    """Convert the $facet result document into a cohort summary"""
+    totals = result['totals'][0] if result.get('totals') else None
+    if not totals:
+        return empty_summary()
+    
+    heatmap = [[0] * len(HEATMAP_ENGAGEMENT_RANGES) for _ in HEATMAP_ATTENDANCE_RANGES]
+    for cell in result.get('heatmap', []):
+        row, col = cell['_id']['attendance'], cell['_id']['engagement']
+        if row >= 0 and col >= 0:
+            heatmap[row][col] = cell['count']
+    
+    return {
+        'total': totals['total'],
+        'averages': {field: totals[f'avg_{field}'] for field in SUMMARY_FIELDS},
+        'medians': {field: 0 for field in MEDIAN_FIELDS},
+        'minimums': {field: totals[f'min_{field}'] for field in RANGE_FIELDS},
+        'maximums': {field: totals[f'max_{field}'] for field in RANGE_FIELDS},
+        'counts': {name: totals[f'count_{name}'] for name in COUNT_EXPRESSIONS},
+        'heatmap': heatmap
+    }
+
+
+def medians_from_aggregation(result):
+    """Convert the median $facet result into {field: median}"""
+    medians = {}
+    for field in MEDIAN_FIELDS:
+        values = [doc['value'] for doc in result.get(field, [])]
+        if len(values) == 2:
+            medians[field] = (values[0] + values[1]) / 2
+        else:
+            medians[field] = values[0] if values else 0
+    return medians
+
+
+def empty_summary():
+    """Summary for an empty cohort"""
+    return {
+        'total': 0,
+        'averages': {field: 0 for field in SUMMARY_FIELDS},
+        'medians': {field: 0 for field in MEDIAN_FIELDS},
+        'minimums': {field: 0 for field in RANGE_FIELDS},
+        'maximums': {field: 0 for field in RANGE_FIELDS},
+        'counts': {name: 0 for name in COUNT_EXPRESSIONS},
+        'heatmap': [[0] * len(HEATMAP_ENGAGEMENT_RANGES) for _ in HEATMAP_ATTENDANCE_RANGES]
+    }
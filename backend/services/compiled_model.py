@@ -0,0 +1,232 @@
+"""
+Compiled inference for the completion model
+
+sklearn's transform/predict_proba path validates and converts its input on every
+call, which costs far more than the trees themselves when scoring one student.
+compile_model flattens a fitted binary gradient boosting classifier (either
+backend in services.model_backends) into a handful of NumPy arrays, with the
+StandardScaler folded into the split thresholds:
+
+    (x - mean) / scale <= t   <=>   x <= T,   T ~ t * scale + mean      (scale > 0)
+
+with T found to the bit, so raw, unscaled features go straight in. Evaluation
+walks every tree at once, one level per step, then sums the leaf values and
+applies the logistic link.
+check_parity compares it with the sklearn model before it is used.
+"""
+
+import os
+import numpy as np
+from scipy.special import expit
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier
+
+# Largest probability difference from sklearn accepted by check_parity
+PARITY_TOLERANCE = 1e-9
+# Larger batches go to sklearn, whose compiled tree code wins once validation is amortized
+COMPILED_MAX_ROWS = int(os.getenv('MODEL_COMPILED_MAX_ROWS', 64))
+
+ARRAY_FIELDS = ['feature', 'threshold', 'left', 'right', 'value', 'missing_left', 'roots', 'classes']
+
+
+class CompiledModel:
+    """Flattened tree ensemble; node indexes are global across trees, leaves point to themselves"""
+
+    def __init__(self, feature, threshold, left, right, value, missing_left, roots, classes,
+                 baseline, depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.missing_left = missing_left
+        self.roots = roots
+        self.classes = classes
+        self.baseline = float(baseline)
+        self.depth = int(depth)
+
+    def decision_function(self, X):
+        """Raw log-odds for each row of the unscaled feature matrix X"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.depth):
+            x = X[rows, self.feature[nodes]]
+            go_left = (x <= self.threshold[nodes]) | (np.isnan(x) & self.missing_left[nodes])
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.baseline + self.value[nodes].sum(axis=1)
+
+    def predict_proba(self, X):
+        """(n, 2) class probabilities in the order of classes, like sklearn's predict_proba"""
+        positive = expit(self.decision_function(X))
+        return np.column_stack([1 - positive, positive])
+
+    def to_arrays(self):
+        arrays = {name: getattr(self, name) for name in ARRAY_FIELDS}
+        arrays['baseline'] = np.array(self.baseline)
+        arrays['depth'] = np.array(self.depth)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        fields = {name: np.asarray(arrays[name]) for name in ARRAY_FIELDS}
+        return cls(baseline=float(arrays['baseline']), depth=int(arrays['depth']), **fields)
+
+    def stats(self):
+        return {'trees': len(self.roots), 'nodes': len(self.feature), 'depth': self.depth}
+
+
+def _tree_nodes(model):
+    """Per tree: (feature, threshold, left, right, value, missing_left, is_leaf), in scaled space"""
+    trees = []
+    if isinstance(model, HistGradientBoostingClassifier):
+        for (predictor,) in model._predictors:
+            nodes = predictor.nodes
+            trees.append((
+                nodes['feature_idx'].astype(np.int64),
+                nodes['num_threshold'].astype(np.float64),
+                nodes['left'].astype(np.int64),
+                nodes['right'].astype(np.int64),
+                nodes['value'].astype(np.float64),
+                nodes['missing_go_to_left'].astype(bool),
+                nodes['is_leaf'].astype(bool)
+            ))
+    elif isinstance(model, GradientBoostingClassifier):
+        for (estimator,) in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            trees.append((
+                np.where(is_leaf, 0, tree.feature).astype(np.int64),
+                tree.threshold.astype(np.float64),
+                tree.children_left.astype(np.int64),
+                tree.children_right.astype(np.int64),
+                tree.value[:, 0, 0] * model.learning_rate,
+                np.zeros(tree.node_count, dtype=bool),
+                is_leaf
+            ))
+    else:
+        raise TypeError(f"Cannot compile {type(model).__name__}")
+    return trees
+
+
+def _baseline(model, n_features):
+    if isinstance(model, HistGradientBoostingClassifier):
+        return float(np.ravel(model._baseline_prediction)[0])
+    return float(model._raw_predict_init(np.zeros((1, n_features)))[0, 0])
+
+
+def _depth(left, right, is_leaf, root):
+    depth = 0
+    level = [root]
+    while True:
+        level = [child for node in level if not is_leaf[node] for child in (left[node], right[node])]
+        if not level:
+            return depth
+        depth += 1
+
+
+def _to_key(x):
+    """Map float64 values to int64 keys with the same order (-0.0 and 0.0 share a key)"""
+    bits = x.view(np.int64)
+    return np.where(bits >= 0, bits, -(bits & np.int64(0x7FFFFFFFFFFFFFFF)))
+
+
+def _from_key(key):
+    bits = np.where(key >= 0, key, (-key) | np.int64(-0x8000000000000000))
+    return bits.view(np.float64)
+
+
+def _fold_thresholds(threshold, mean, scale, float32):
+    """Largest x with scaled(x) <= threshold, per split
+
+    threshold * scale + mean is within a few ulps of it, but a split exactly on a data
+    value needs the boundary to the bit. scaled(x) is (x - mean) / scale as sklearn
+    computes it, cast to float32 where the model compares in float32; it is monotonic
+    in x, so a bisection over the ordered float64 bit patterns finds the boundary.
+    """
+    def below(x):
+        scaled = (x - mean) / scale
+        if float32:
+            scaled = scaled.astype(np.float32).astype(np.float64)
+        return scaled <= threshold
+
+    estimate = threshold * scale + mean
+    margin = (np.abs(threshold) * 1e-4 + 1e-12) * scale + np.abs(estimate) * 1e-12
+    low, high = estimate - margin, estimate + margin
+    if not (below(low).all() and not below(high).any()):
+        raise ValueError('Could not fold the scaler into the split thresholds')
+
+    low_key, high_key = _to_key(low), _to_key(high)
+    while (high_key - low_key > 1).any():
+        middle_key = low_key + (high_key - low_key) // 2
+        middle_below = below(_from_key(middle_key))
+        low_key = np.where(middle_below, middle_key, low_key)
+        high_key = np.where(middle_below, high_key, middle_key)
+    return _from_key(low_key)
+
+
+def compile_model(model, scaler=None):
+    """CompiledModel equivalent to scaler.transform followed by model.predict_proba"""
+    if len(model.classes_) != 2:
+        raise ValueError('Only binary classifiers can be compiled')
+    n_features = model.n_features_in_
+    mean = scaler.mean_ if scaler is not None else np.zeros(n_features)
+    scale = scaler.scale_ if scaler is not None else np.ones(n_features)
+    # The exact implementation compares float32 copies of the (scaled) features
+    float32 = isinstance(model, GradientBoostingClassifier)
+
+    parts = {name: [] for name in ['feature', 'threshold', 'left', 'right', 'value', 'missing_left']}
+    roots = []
+    depth = 0
+    offset = 0
+    for feature, threshold, left, right, value, missing_left, is_leaf in _tree_nodes(model):
+        count = len(feature)
+        own = np.arange(count)
+        # Leaves loop back to themselves, so every tree can take the same number of steps
+        left = np.where(is_leaf, own, left) + offset
+        right = np.where(is_leaf, own, right) + offset
+        parts['feature'].append(feature)
+        folded = np.full(count, np.inf)
+        split = ~is_leaf & np.isfinite(threshold)
+        folded[split] = _fold_thresholds(
+            threshold[split], mean[feature[split]], scale[feature[split]], float32
+        )
+        folded[~is_leaf & ~np.isfinite(threshold)] = threshold[~is_leaf & ~np.isfinite(threshold)]
+        parts['threshold'].append(folded)
+        parts['left'].append(left)
+        parts['right'].append(right)
+        parts['value'].append(np.where(is_leaf, value, 0.0))
+        parts['missing_left'].append(missing_left)
+        roots.append(offset)
+        depth = max(depth, _depth(left - offset, right - offset, is_leaf, 0))
+        offset += count
+
+    arrays = {name: np.concatenate(values) for name, values in parts.items()}
+    return CompiledModel(
+        roots=np.array(roots, dtype=np.int64),
+        classes=np.asarray(model.classes_),
+        baseline=_baseline(model, n_features),
+        depth=depth,
+        **arrays
+    )
+
+
+def check_parity(compiled, model, scaler=None, X=None, samples=2000, seed=0):
+    """Largest probability difference between compiled and sklearn over X
+
+    Without X, rows are drawn across the range of each feature's split thresholds,
+    which is where the two could disagree.
+    """
+    if X is None:
+        rng = np.random.default_rng(seed)
+        n_features = model.n_features_in_
+        X = np.empty((samples, n_features))
+        for j in range(n_features):
+            thresholds = compiled.threshold[(compiled.feature == j) & np.isfinite(compiled.threshold)]
+            low, high = (thresholds.min(), thresholds.max()) if len(thresholds) else (0.0, 1.0)
+            spread = max(high - low, 1.0)
+            X[:, j] = rng.uniform(low - 0.1 * spread, high + 0.1 * spread, samples)
+    X = np.asarray(X, dtype=np.float64)
+    expected = model.predict_proba(scaler.transform(X) if scaler is not None else X)
+    return float(np.abs(compiled.predict_proba(X) - expected).max())
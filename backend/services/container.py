@@ -0,0 +1,58 @@
+"""
+Application-wide service container
+
+Every blueprint shares one instance of each service, built on first use.
+They share one DataService and therefore the single pooled MongoClient in
+config.database. MLService loads the model files from disk only once per process.
+"""
+
+import threading
+from services.data_service import DataService
+
+class ServiceContainer:
+    """Lazily built, process-wide service singletons"""
+
+    def __init__(self):
+        self._instances = {}
+        self._lock = threading.RLock()
+
+    def _get(self, name, factory):
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+        return instance
+
+    @property
+    def data_service(self):
+        return self._get('data', DataService)
+
+    @property
+    def insights_service(self):
+        from services.insights_service import InsightsService
+        return self._get('insights', lambda: InsightsService(self.data_service))
+
+    @property
+    def trends_service(self):
+        from services.trends_service import TrendsService
+        return self._get('trends', lambda: TrendsService(self.data_service))
+
+    @property
+    def ml_service(self):
+        from services.ml_service import MLService
+        return self._get('ml', lambda: MLService(self.data_service))
+
+    @property
+    def training_jobs(self):
+        from services.training_jobs import TrainingJobs
+        return self._get('training_jobs', TrainingJobs)
+
+    def reset(self):
+        """Drop all instances so they are rebuilt on next use"""
+        with self._lock:
+            self._instances.clear()
+
+services = ServiceContainer()
@@ -2,147 +2,243 @@
 Data service for fetching and managing student data from MongoDB
 """
 
+import os
 from config.database import db_config
 from bson import ObjectId
+from pymongo.errors import OperationFailure
+from services.cohort_snapshot import CohortSnapshot
+from services.cohort_summary import (
+    SUMMARY_FIELDS, build_summary_pipeline, build_median_pipeline,
+    summary_from_aggregation, medians_from_aggregation
+)
+from services.student_stats import (
+    build_stats_pipeline, build_percentile_pipeline, stats_from_aggregation,
+    percentiles_from_aggregation, percentiles_from_fallback
+)
+from services.indexes import ensure_indexes
+from services.pagination import encode_cursor
+from services.export import EXPORT_BATCH_SIZE
+from services.projections import response_stages, search_fields, trim_fields
+from services.search import (
+    SEARCH_CANDIDATE_LIMIT, SEARCH_MAX_TIME_MS,
+    build_search_queries, rank_matches, backfill_search_keys
+)
+from services import analytics
+from services.cache import result_cache
 
 class DataService:
     """Service for data operations"""
 
     def __init__(self):
-        if db_config.db is None:
-            connected = db_config.connect()
-            if not connected:
-                raise Exception("Failed to connect to MongoDB")
+        if not db_config.ensure_connected():
+            raise Exception("Failed to connect to MongoDB")
         
-        self.collection = db_config.get_collection('students')
-
-    def _convert_objectid(self, obj):
-        """Convert ObjectId to string for JSON serialization"""
-        if isinstance(obj, ObjectId):
-            return str(obj)
-        elif isinstance(obj, dict):
-            return {k: self._convert_objectid(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._convert_objectid(item) for item in obj]
-        return obj
-
-    def get_student_by_id(self, student_id):
-        """Get a student by ID"""
+        # 'database' pushes cohort statistics into MongoDB, 'memory' computes them from a snapshot
+        self.analytics_source = os.getenv('ANALYTICS_SOURCE', 'database').lower()
+        
+        # Index builds and backfills belong to loads (scripts/insert_data.py) and
+        # POST /api/admin/indexes, not to every API worker that starts
+        if os.getenv('MONGO_ENSURE_INDEXES', 'false').lower() == 'true':
+            backfill_search_keys(self.collection)
+            ensure_indexes(self.collection)
+
+    @property
+    def collection(self):
+        """Students collection, resolved per call so forked workers use their own client"""
+        return db_config.get_collection('students')
+
+    @staticmethod
+    def _find_pipeline(match, fields=None, sort=None, skip=0, limit=None):
+        """A find as an aggregation that also shapes documents for responses"""
+        pipeline = [{'$match': match}]
+        if sort:
+            pipeline.append({'$sort': sort})
+        if skip:
+            pipeline.append({'$skip': skip})
+        if limit:
+            pipeline.append({'$limit': limit})
+        return pipeline + response_stages(fields)
+
+    def _find(self, match, fields=None, sort=None, skip=0, limit=None, **kwargs):
+        pipeline = self._find_pipeline(match, fields, sort, skip, limit)
+        return list(self.collection.aggregate(pipeline, **kwargs))
+
+    def get_student_by_id(self, student_id, fields=None):
+        """Get a student by ID (fields: list of fields to return, None for all)"""
         try:
-            student = self.collection.find_one({'StudentID': str(student_id)})
-            if not student:
-                try:
-                    student = self.collection.find_one({'_id': ObjectId(student_id)})
-                except:
-                    pass
-            
-            if student:
-                student = self._convert_objectid(student)
-                if '_id' in student:
-                    student['id'] = student.pop('_id')
-                return student
-            return None
+            students = self._find({'StudentID': str(student_id)}, fields, limit=1)
+            if not students and ObjectId.is_valid(student_id):
+                students = self._find({'_id': ObjectId(student_id)}, fields, limit=1)
+            return students[0] if students else None
         except Exception as e:
             print(f"Error fetching student: {e}")
             return None
 
-    def get_students(self, page=1, limit=200, search=''):
-        """Get paginated list of students"""
+    def get_students_by_ids(self, student_ids, fields=None):
+        """Get many students in one query, keyed by the requested ID"""
         try:
-            skip = (page - 1) * limit
-            query = {}
+            if fields is not None:
+                fields = list(dict.fromkeys(fields + ['StudentID']))
+            ids = [str(student_id) for student_id in student_ids]
+            object_ids = [ObjectId(i) for i in ids if ObjectId.is_valid(i)]
+            query = {'StudentID': {'$in': ids}}
+            if object_ids:
+                query = {'$or': [query, {'_id': {'$in': object_ids}}]}
 
-            if search:
-                query = {
-                    '$or': [
-                        {'StudentID': {'$regex': search, '$options': 'i'}},
-                        {'Name': {'$regex': search, '$options': 'i'}}
-                    ]
-                }
-            
-            students = list(self.collection.find(query).skip(skip).limit(limit))
-            total = self.collection.count_documents(query)
+            by_student_id = {}
+            by_object_id = {}
+            for student in self._find(query, fields):
+                by_student_id[str(student.get('StudentID'))] = student
+                by_object_id[student.get('id')] = student
+
+            # StudentID matches take precedence over _id matches, as in get_student_by_id
+            found = {}
+            for i in ids:
+                student = by_student_id.get(i) or by_object_id.get(i)
+                if student:
+                    found[i] = student
+            return found
+        except Exception as e:
+            print(f"Error fetching students: {e}")
+            return {}
+
+    def get_students(self, page=1, limit=200, search='', cursor=None, include_total=True, fields=None):
+        """Get a page of students
 
-            students = [self._convert_objectid(s) for s in students]
-            for student in students:
-                if '_id' in student:
-                    student['id'] = student.pop('_id')
+        Without a search, pages are keyset ranges of _id: pass the decoded pagination.next
+        position as cursor and every page costs the same. page still works (via skip) for
+        older clients. The total is the collection's estimated count. fields limits the
+        returned fields (see services.projections).
+        """
+        try:
+            if build_search_queries(search):
+                return self._search_students(search, page, limit, cursor, fields)
+            
+            query = {}
+            if cursor:
+                query = {'_id': {'$gt': ObjectId(cursor['after'])}}
+            skip = (page - 1) * limit if not cursor and page > 1 else 0
+            
+            # One extra document tells whether there is a next page
+            students = self._find(query, fields, sort={'_id': 1}, skip=skip, limit=limit + 1)
+            has_more = len(students) > limit
+            students = students[:limit]
+            total = self.collection.estimated_document_count() if include_total else None
+            
+            next_cursor = None
+            if has_more:
+                next_cursor = encode_cursor({'after': students[-1]['id']})
             
             return {
                 'students': students,
                 'pagination': {
-                    'page': page,
+                    'page': None if cursor else page,
                     'limit': limit,
                     'total': total,
-                    'pages': (total + limit - 1) // limit
+                    'pages': (total + limit - 1) // limit if total is not None else None,
+                    'next': next_cursor
                 }
             }
         except Exception as e:
             print(f"Error fetching students: {e}")
-            return {'students': [], 'pagination': {'page': 1, 'limit': limit, 'total': 0, 'pages': 0}}
+            return {'students': [], 'pagination': {'page': 1, 'limit': limit, 'total': 0, 'pages': 0, 'next': None}}
+
+    def _search_students(self, search, page, limit, cursor=None, fields=None):
+        """Ranked prefix search, bounded by SEARCH_CANDIDATE_LIMIT matches"""
+        exact, prefix = [
+            self._find(
+                query, search_fields(fields), limit=SEARCH_CANDIDATE_LIMIT, maxTimeMS=SEARCH_MAX_TIME_MS
+            )
+            for query in build_search_queries(search)
+        ]
+        
+        ranked = rank_matches(exact, prefix, search)
+        total = len(ranked)
+        skip = cursor['offset'] if cursor else (page - 1) * limit
+        
+        return {
+            'students': [trim_fields(s, fields) for s in ranked[skip:skip + limit]],
+            'pagination': {
+                'page': None if cursor else page,
+                'limit': limit,
+                'total': total,
+                'pages': (total + limit - 1) // limit,
+                'next': encode_cursor({'offset': skip + limit}) if skip + limit < total else None,
+                'capped': len(prefix) >= SEARCH_CANDIDATE_LIMIT
+            }
+        }
 
-    def get_all_students(self):
+    def iter_students(self, fields=None, batch_size=EXPORT_BATCH_SIZE):
+        """Cursor over all students in _id order, fetched batch_size at a time (for exports)"""
+        pipeline = self._find_pipeline({}, fields, sort={'_id': 1})
+        return self.collection.aggregate(pipeline, batchSize=batch_size)
+
+    def get_all_students(self, fields=None):
         """Get all students (for analysis)"""
         try:
-            students = list(self.collection.find({}))
-            return [self._convert_objectid(s) for s in students]
+            return self._find({}, fields)
         except Exception as e:
             print(f"Error fetching all students: {e}")
             return []
 
-    def get_student_stats(self):
-        """Get overall student statistics"""
+    def get_cohort_snapshot(self, fields, id_field=None):
+        """Get the given fields for all students as columns (single scan)"""
         try:
-            total_students = self.collection.count_documents({})
-
-            pipeline = [
-                {
-                    '$group': {
-                        '_id': None,
-                        'avgFinalGrade': {'$avg': '$FinalGrade'},
-                        'avgExamScore': {'$avg': '$ExamScore'},
-                        'avgStudyHours': {'$avg': '$StudyHours'},
-                        'avgAttendance': {'$avg': '$Attendance'},
-                        'avgEngagementScore': {'$avg': '$EngagementScore'},
-                        'minFinalGrade': {'$min': '$FinalGrade'},
-                        'maxFinalGrade': {'$max': '$FinalGrade'}
-                    }
-                }
-            ]
+            projection = {field: 1 for field in fields}
+            if id_field:
+                projection[id_field] = 1
+            projection['_id'] = 0
+            cursor = self.collection.find({}, projection)
+            return CohortSnapshot.from_documents(cursor, fields, id_field)
+        except Exception as e:
+            # Raised, not returned empty: an empty snapshot would be cached as a real result
+            print(f"Error fetching cohort snapshot: {e}")
+            raise
 
-            result = list(self.collection.aggregate(pipeline))
-            stats = result[0] if result else {}
+    def get_cohort_summary(self):
+        """Get cohort-wide averages, bucket counts and engagement heatmap"""
+        return result_cache.get_or_compute(
+            'cohort.summary', {'source': self.analytics_source}, self._compute_cohort_summary
+        )
 
-            high_risk = self.collection.count_documents({'RiskScore': {'$gte': 70}})
-            medium_risk = self.collection.count_documents({'RiskScore': {'$gte': 40, '$lt': 70}})
-            low_risk = self.collection.count_documents({'RiskScore': {'$lt': 40}})
+    def _compute_cohort_summary(self):
+        if self.analytics_source == 'memory':
+            return analytics.summarize(self.get_cohort_snapshot(SUMMARY_FIELDS))
 
-            return {
-                'total_students': total_students,
-                'averages': {
-                    'final_grade': round(stats.get('avgFinalGrade', 0), 2),
-                    'exam_score': round(stats.get('avgExamScore', 0), 2),
-                    'study_hours': round(stats.get('avgStudyHours', 0), 2),
-                    'attendance': round(stats.get('avgAttendance', 0), 2),
-                    'engagement_score': round(stats.get('avgEngagementScore', 0), 2)
-                },
-                'ranges': {
-                    'final_grade': {
-                        'min': stats.get('minFinalGrade', 0),
-                        'max': stats.get('maxFinalGrade', 0)
-                    }
-                },
-                'risk_distribution': {
-                    'high': high_risk,
-                    'medium': medium_risk,
-                    'low': low_risk
-                }
-            }
+        try:
+            result = next(self.collection.aggregate(build_summary_pipeline()), {})
+            summary = summary_from_aggregation(result)
+            if summary['total']:
+                # Exact medians, like statistics.median (see build_median_pipeline)
+                pipeline = build_median_pipeline(summary['total'])
+                medians = next(self.collection.aggregate(pipeline), {})
+                summary['medians'] = medians_from_aggregation(medians)
+            return summary
         except Exception as e:
+            # Raised so result_cache does not keep zeros for the rest of the TTL
+            print(f"Error calculating cohort summary: {e}")
+            raise
+
+    def get_student_stats(self, with_percentiles=False):
+        """Get overall student statistics"""
+        try:
+            try:
+                result = next(self.collection.aggregate(build_stats_pipeline(with_percentiles)), {})
+                stats = stats_from_aggregation(result)
+                if with_percentiles:
+                    stats['percentiles'] = percentiles_from_aggregation(result)
+                return stats
+            except OperationFailure:
+                if not with_percentiles:
+                    raise
+                # $percentile needs MongoDB 7.0+, fall back to exact sort/skip percentiles
+                result = next(self.collection.aggregate(build_stats_pipeline()), {})
+                stats = stats_from_aggregation(result)
+                pipeline = build_percentile_pipeline(result)
+                percentiles = next(self.collection.aggregate(pipeline), {}) if pipeline else {}
+                stats['percentiles'] = percentiles_from_fallback(percentiles)
+                return stats
+        except Exception as e:
+            # Raised so result_cache does not keep zeros for the rest of the TTL
             print(f"Error calculating stats: {e}")
-            return {
-                'total_students': 0,
-                'averages': {},
-                'ranges': {},
-                'risk_distribution': {'high': 0, 'medium': 0, 'low': 0}
-            }
\ No newline at end of file
+            raise
\ No newline at end of file
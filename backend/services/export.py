@@ -0,0 +1,66 @@
+"""
+Streaming cohort export
+
+Documents flow from a MongoDB cursor (fetched EXPORT_BATCH_SIZE at a time)
+through these generators into the HTTP response, so an export holds one batch
+and one output chunk in memory regardless of how many students there are.
+"""
+
+import io
+import os
+import csv
+import zlib
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+
+# Output is yielded in pieces of about this many bytes
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def ndjson_chunks(students, dumps_bytes):
+    """One JSON document per line"""
+    buffer = []
+    size = 0
+    for student in students:
+        line = dumps_bytes(student) + b'\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def csv_chunks(students, fields=None):
+    """CSV with a header row; columns are fields, or the first student's keys"""
+    out = io.StringIO()
+    writer = None
+    for student in students:
+        if writer is None:
+            columns = ['id'] + [f for f in fields if f != 'id'] if fields else list(student)
+            writer = csv.DictWriter(out, fieldnames=columns, extrasaction='ignore')
+            writer.writeheader()
+        writer.writerow(student)
+        if out.tell() >= EXPORT_CHUNK_BYTES:
+            yield out.getvalue().encode()
+            out.seek(0)
+            out.truncate()
+    if out.tell():
+        yield out.getvalue().encode()
+
+
+def gzip_chunks(chunks, level=6):
+    """Compress a stream of byte chunks into one gzip stream"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
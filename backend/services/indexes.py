@@ -0,0 +1,167 @@
+"""
+Declarative index specification for the students collection
+
+STUDENT_INDEXES lists every index the API relies on. ensure_indexes applies the
+spec idempotently and drops RETIRED_INDEXES; scripts/insert_data.py runs it on
+each load before the swap and POST /api/admin/indexes runs it on demand. API
+workers do not touch indexes at startup unless MONGO_ENSURE_INDEXES=true.
+index_status compares the spec with what exists, and explain_hot_queries
+reports the plan MongoDB picks for each hot query.
+"""
+
+from bson import ObjectId
+from pymongo import IndexModel, ASCENDING
+from pymongo.errors import OperationFailure
+
+STUDENT_INDEXES = [
+    {
+        'name': 'student_id_unique',
+        'keys': [('StudentID', ASCENDING)],
+        'options': {'unique': True}
+    },
+    {
+        # Anchored prefix search on normalized StudentID/Name keys (services.search)
+        'name': 'search_keys',
+        'keys': [('SearchKeys', ASCENDING)],
+        'options': {}
+    },
+]
+
+# Indexes from earlier specs that no query uses any more; ensure_indexes drops them.
+# Cohort stats and summaries scan the whole collection, so range indexes on
+# RiskScore/FinalGrade/Attendance only slowed down loads.
+RETIRED_INDEXES = ['risk_score_final_grade', 'final_grade_risk_score', 'attendance_engagement', 'name_ci']
+
+# The queries DataService issues on its request paths, as find() arguments.
+# Pages and exports walk the collection in _id order, so they use the _id index.
+HOT_QUERIES = {
+    'student_by_id': {'filter': {'StudentID': 'STU0001'}, 'limit': 1},
+    'students_by_ids': {'filter': {'StudentID': {'$in': ['STU0001', 'STU0002', 'STU0003']}}},
+    'students_page': {'filter': {}, 'sort': [('_id', ASCENDING)], 'limit': 201},
+    'students_page_after': {
+        'filter': {'_id': {'$gt': ObjectId('0' * 24)}}, 'sort': [('_id', ASCENDING)], 'limit': 201
+    },
+    'search_exact': {'filter': {'SearchKeys': 'stu0001'}, 'limit': 500},
+    'search_prefix': {'filter': {'SearchKeys': {'$regex': '^stu00'}}, 'limit': 500},
+}
+
+# Server error codes for an existing index with the same name or keys but other options
+INDEX_CONFLICT_CODES = (85, 86)
+
+
+def _index_model(spec):
+    return IndexModel(spec['keys'], name=spec['name'], **spec['options'])
+
+
+def ensure_indexes(collection, specs=STUDENT_INDEXES):
+    """Create any missing index in specs, rebuild ones whose definition changed and drop retired ones"""
+    report = {'created': [], 'rebuilt': [], 'existing': [], 'dropped': [], 'failed': {}}
+    existing = collection.index_information()
+    
+    for name in RETIRED_INDEXES:
+        if name not in existing:
+            continue
+        try:
+            collection.drop_index(name)
+            report['dropped'].append(name)
+        except Exception as e:
+            print(f"Error dropping index {name}: {e}")
+            report['failed'][name] = str(e)
+    
+    for spec in specs:
+        if spec['name'] in existing and _matches(existing[spec['name']], spec):
+            report['existing'].append(spec['name'])
+            continue
+        
+        try:
+            try:
+                collection.create_indexes([_index_model(spec)])
+                report['created'].append(spec['name'])
+            except OperationFailure as e:
+                if e.code not in INDEX_CONFLICT_CODES:
+                    raise
+                collection.drop_index(spec['name'] if spec['name'] in existing else spec['keys'])
+                collection.create_indexes([_index_model(spec)])
+                report['rebuilt'].append(spec['name'])
+        except Exception as e:
+            print(f"Error creating index {spec['name']}: {e}")
+            report['failed'][spec['name']] = str(e)
+    
+    return report
+
+
+def _matches(info, spec):
+    """Whether an index_information() entry has the keys and options of a spec"""
+    if [tuple(key) for key in info.get('key', [])] != [tuple(key) for key in spec['keys']]:
+        return False
+    if bool(info.get('unique')) != bool(spec['options'].get('unique')):
+        return False
+    collation = spec['options'].get('collation')
+    if collation:
+        current = info.get('collation') or {}
+        return all(current.get(k) == v for k, v in collation.items())
+    return not info.get('collation')
+
+
+def index_status(collection, specs=STUDENT_INDEXES):
+    """Compare the indexes on the collection with the spec"""
+    existing = collection.index_information()
+    declared = {spec['name'] for spec in specs}
+    
+    status = {}
+    for spec in specs:
+        if spec['name'] not in existing:
+            status[spec['name']] = 'missing'
+        elif _matches(existing[spec['name']], spec):
+            status[spec['name']] = 'ok'
+        else:
+            status[spec['name']] = 'mismatched'
+    
+    return {
+        'indexes': status,
+        'undeclared': sorted(name for name in existing if name not in declared and name != '_id_'),
+        'in_sync': all(value == 'ok' for value in status.values())
+    }
+
+
+def _plan_stages(plan):
+    """Flatten a winning plan into its stage names, outermost first"""
+    stages = []
+    while plan:
+        stages.append(plan.get('stage'))
+        if plan.get('indexName'):
+            stages[-1] = f"{plan['stage']}({plan['indexName']})"
+        plan = plan.get('inputStage') or (plan.get('inputStages') or [None])[0]
+    return stages
+
+
+def explain_hot_queries(collection, queries=HOT_QUERIES):
+    """Summarize the winning plan and execution statistics of each hot query"""
+    plans = {}
+    for name, query in queries.items():
+        try:
+            cursor = collection.find(query['filter'])
+            if query.get('sort'):
+                cursor = cursor.sort(query['sort'])
+            if query.get('limit'):
+                cursor = cursor.limit(query['limit'])
+            if query.get('collation'):
+                cursor = cursor.collation(query['collation'])
+            explain = cursor.explain()
+            
+            planner = explain.get('queryPlanner', {})
+            winning = planner.get('winningPlan', {})
+            # Plans from the slot-based engine nest the classic tree under queryPlan
+            stages = _plan_stages(winning.get('queryPlan', winning))
+            execution = explain.get('executionStats', {})
+            plans[name] = {
+                'stages': stages,
+                'uses_index': not any(stage == 'COLLSCAN' for stage in stages),
+                'returned': execution.get('nReturned'),
+                'keys_examined': execution.get('totalKeysExamined'),
+                'docs_examined': execution.get('totalDocsExamined'),
+                'time_ms': execution.get('executionTimeMillis')
+            }
+        except Exception as e:
+            plans[name] = {'error': str(e)}
+    return plans
@@ -7,8 +7,8 @@ from services.data_service import DataService
 class InsightsService:
     """Service for generating insights"""
     
-    def __init__(self):
-        self.data_service = DataService()
+    def __init__(self, data_service=None):
+        self.data_service = data_service or DataService()
     
     def generate_student_insights(self, student):
         """Generate comprehensive insights for a student"""
@@ -26,8 +26,9 @@ class InsightsService:
     
     def get_overview_insights(self):
         """Get overall insights across all students"""
-        all_students = self.data_service.get_all_students()
-        if not all_students:
+        summary = self.data_service.get_cohort_summary()
+        total = summary['total']
+        if not total:
             return {
                 'total_students': 0,
                 'summary': 'No student data available',
@@ -40,45 +41,29 @@ class InsightsService:
                 'engagement_heatmap': []
             }
         
-        total = len(all_students)
-        avg_engagement = sum(s.get('EngagementScore', 0) for s in all_students) / total
-        avg_grade = sum(s.get('FinalGrade', 0) for s in all_students) / total
-        avg_study_hours = sum(s.get('StudyHours', 0) for s in all_students) / total
-        avg_attendance = sum(s.get('Attendance', 0) for s in all_students) / total
-        high_risk = sum(1 for s in all_students if s.get('RiskScore', 0) >= 70)
+        averages = summary['averages']
+        avg_engagement = averages['EngagementScore']
+        avg_grade = averages['FinalGrade']
+        avg_study_hours = averages['StudyHours']
+        avg_attendance = averages['Attendance']
+        high_risk = summary['counts']['high_risk']
         
-        # Generate engagement heatmap (7x5 grid representing engagement patterns)
-        # Group students by engagement score ranges and create a heatmap
-        engagement_ranges = [
-            (0, 20), (20, 40), (40, 60), (60, 80), (80, 100)
-        ]
-        attendance_ranges = [
-            (0, 40), (40, 60), (60, 80), (80, 90), (90, 100)
-        ]
-        
-        heatmap = []
-        for att_range in attendance_ranges:
-            row = []
-            for eng_range in engagement_ranges:
-                count = sum(1 for s in all_students 
-                           if att_range[0] <= s.get('Attendance', 0) < att_range[1]
-                           and eng_range[0] <= s.get('EngagementScore', 0) < eng_range[1])
-                row.append(count)
-            heatmap.append(row)
+        # Engagement heatmap: attendance ranges (rows) x engagement score ranges (columns)
+        heatmap = summary['heatmap']
         
         # Generate summary
-        passing_rate = (sum(1 for s in all_students if s.get('FinalGrade', 0) >= 60) / total * 100) if total > 0 else 0
+        passing_rate = (summary['counts']['grade_passing'] / total * 100) if total > 0 else 0
         summary_parts = [
             f"Total students: {total}",
             f"Average grade: {avg_grade:.1f}",
             f"Passing rate: {passing_rate:.1f}%",
             f"High risk students: {high_risk} ({high_risk/total*100:.1f}%)" if total > 0 else "High risk students: 0"
         ]
-        summary = ". ".join(summary_parts)
+        summary_text = ". ".join(summary_parts)
         
         return {
             'total_students': total,
-            'summary': summary,
+            'summary': summary_text,
             'averages': {
                 'final_grade': round(avg_grade, 2),
                 'engagement_score': round(avg_engagement, 2),
@@ -95,17 +80,14 @@ class InsightsService:
         if student:
             return self._analyze_engagement(student)
         else:
-            all_students = self.data_service.get_all_students()
-            if not all_students:
+            summary = self.data_service.get_cohort_summary()
+            if not summary['total']:
                 return {'error': 'No student data available'}
             
-            avg_engagement = sum(s.get('EngagementScore', 0) for s in all_students) / len(all_students)
-            high_engagement = sum(1 for s in all_students if s.get('EngagementScore', 0) >= 70)
-            
             return {
-                'average_engagement': round(avg_engagement, 2),
-                'high_engagement_count': high_engagement,
-                'total_students': len(all_students)
+                'average_engagement': round(summary['averages']['EngagementScore'], 2),
+                'high_engagement_count': summary['counts']['engagement_high'],
+                'total_students': summary['total']
             }
     
     def get_performance_insights(self, student=None):
@@ -113,20 +95,19 @@ class InsightsService:
         if student:
             return self._analyze_performance(student)
         else:
-            all_students = self.data_service.get_all_students()
-            if not all_students:
+            summary = self.data_service.get_cohort_summary()
+            total = summary['total']
+            if not total:
                 return {'error': 'No student data available'}
             
-            avg_grade = sum(s.get('FinalGrade', 0) for s in all_students) / len(all_students)
-            avg_exam = sum(s.get('ExamScore', 0) for s in all_students) / len(all_students)
-            passing = sum(1 for s in all_students if s.get('FinalGrade', 0) >= 60)
+            passing = summary['counts']['grade_passing']
             
             return {
-                'average_grade': round(avg_grade, 2),
-                'average_exam_score': round(avg_exam, 2),
+                'average_grade': round(summary['averages']['FinalGrade'], 2),
+                'average_exam_score': round(summary['averages']['ExamScore'], 2),
                 'passing_students': passing,
-                'passing_rate': round((passing / len(all_students)) * 100, 2) if all_students else 0,
-                'total_students': len(all_students)
+                'passing_rate': round((passing / total) * 100, 2),
+                'total_students': total
             }
     
     def _get_overview(self, student):
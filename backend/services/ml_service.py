@@ -3,35 +3,115 @@ ML Service for training models and making predictions
 """
 
 import os
+import time
 import pickle
+import threading
+from datetime import datetime
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report
+from pymongo import ReplaceOne
+from config.database import db_config
 from services.data_service import DataService
+from services.cache import dataset_version
+from services.projections import PROFILES
+from services.model_backends import MODEL_SEARCH, fit_estimator, feature_importance
+from services.compiled_model import COMPILED_MAX_ROWS, PARITY_TOLERANCE, compile_model, check_parity
+from services.model_artifacts import (
+    BundleError, current_bundle_id, load_compiled, load_estimator, new_bundle_id, read_manifest,
+    write_bundle
+)
+from services.model_registry import MODEL_AUTO_PROMOTE, ModelRegistry
+from concurrent.futures import ThreadPoolExecutor
 import warnings
 warnings.filterwarnings('ignore')
 
+SCORES_COLLECTION = 'student_scores'
+PREDICTION_FIELDS = ['student_id', 'will_complete', 'completion_likelihood', 'confidence', 'risk_level', 'model_version']
+
+# Dropout risk factors, in the order of the columns built by _classify_dropout_risk
+RISK_FACTOR_LABELS = [
+    'Very low attendance',
+    'Very low engagement',
+    'High risk score',
+    'Low completion likelihood'
+]
+
 class MLService:
     """Service for ML model operations"""
     
-    def __init__(self):
-        self.data_service = DataService()
+    def __init__(self, data_service=None):
+        self.data_service = data_service or DataService()
         self.model_dir = os.getenv('MODEL_DIR', './models')
-        self.model = None
-        self.scaler = None
+        self._model = None
+        self._scaler = None
         self.model_info = {}
+        # NumPy version of model + scaler for fast scoring; None falls back to sklearn
+        self.compiled = None
+        # Loaded bundle, and the bundle whose estimator is not unpickled yet (see _estimator)
+        self.bundle_id = None
+        self._pending_bundle = None
+        self._estimator_lock = threading.Lock()
+        self.registry = ModelRegistry(self.model_dir)
+        # Re-scores the cohort after a promotion or rollback, one pass at a time
+        self._rescore_pool = None
+        # Seconds between checks of the model files for a newer model written by another process
+        self.reload_check_interval = float(os.getenv('MODEL_RELOAD_CHECK_INTERVAL', 5))
+        self._loaded_signature = None
+        self._reload_checked_at = time.monotonic()
         
         os.makedirs(self.model_dir, exist_ok=True)
         
         self._load_model()
     
-    def train_model(self):
-        """Train the completion prediction model"""
+    @property
+    def model(self):
+        return self._estimator()[0]
+    
+    @model.setter
+    def model(self, model):
+        self._model = model
+        self._pending_bundle = None
+    
+    @property
+    def scaler(self):
+        return self._estimator()[1]
+    
+    @scaler.setter
+    def scaler(self, scaler):
+        self._scaler = scaler
+        self._pending_bundle = None
+    
+    @property
+    def has_model(self):
+        """Whether a model is loaded, without unpickling a lazily loaded estimator"""
+        return self._model is not None or self._pending_bundle is not None
+    
+    def _estimator(self):
+        """(model, scaler), loading the current bundle's estimator on first use"""
+        with self._estimator_lock:
+            if self._pending_bundle is not None:
+                self._model, self._scaler = load_estimator(self.model_dir, self._pending_bundle)
+                self._pending_bundle = None
+            return self._model, self._scaler
+    
+    @property
+    def scores(self):
+        """Materialized scores collection"""
+        return db_config.get_collection(SCORES_COLLECTION)
+    
+    def train_model(self, progress=None):
+        """Train the completion prediction model
+        
+        progress, if given, is called as progress(fraction, stage) while training runs.
+        """
+        progress = progress or (lambda fraction, stage: None)
         try:
-            all_students = self.data_service.get_all_students()
+            progress(0.0, 'loading data')
+            data_version = dataset_version.current()
+            all_students = self.data_service.get_all_students(fields=PROFILES['model'])
             if not all_students or len(all_students) < 10:
                 return {
                     'error': 'Insufficient data for training',
@@ -88,41 +168,51 @@ class MLService:
             X_train_scaled = self.scaler.fit_transform(X_train)
             X_test_scaled = self.scaler.transform(X_test)
             
-            self.model = GradientBoostingClassifier(
-                n_estimators=100,
-                learning_rate=0.1,
-                max_depth=5,
-                random_state=42
+            # Fitting is reported as 10%-90% of the job
+            progress(0.1, 'searching' if MODEL_SEARCH else 'fitting')
+            self.model, fit_details = fit_estimator(
+                X_train_scaled, y_train,
+                progress=lambda fraction, stage: progress(0.1 + 0.8 * fraction, stage)
             )
             
-            self.model.fit(X_train_scaled, y_train)
-            
+            progress(0.9, 'evaluating')
             y_pred = self.model.predict(X_test_scaled)
             accuracy = accuracy_score(y_test, y_pred)
             precision = precision_score(y_test, y_pred, zero_division=0)
             recall = recall_score(y_test, y_pred, zero_division=0)
             f1 = f1_score(y_test, y_pred, zero_division=0)
             
-            feature_importance = dict(zip(available_features, self.model.feature_importances_))
+            importance = feature_importance(self.model, available_features, X_test_scaled, y_test)
             
-            self._save_model()
-            
-            self.model_info = {
+            model_info = {
                 'trained': True,
+                'trained_at': datetime.now().isoformat(),
                 'accuracy': round(accuracy, 4),
                 'precision': round(precision, 4),
                 'recall': round(recall, 4),
                 'f1_score': round(f1, 4),
                 'features_used': available_features,
-                'feature_importance': {k: round(v, 4) for k, v in feature_importance.items()},
+                'feature_importance': {k: round(v, 4) for k, v in importance.items()},
                 'training_samples': len(X_train),
-                'test_samples': len(X_test)
+                'test_samples': len(X_test),
+                'dataset_version': data_version,
+                **fit_details
             }
+            self.model_info = model_info
+            
+            # model_info stays this model's even if it is not promoted and another one is reloaded
+            self._save_model(parity_rows=X_test)
+            
+            progress(0.95, 'scoring cohort')
+            materialized = self.materialize_scores()
             
             return {
                 'success': True,
                 'message': 'Model trained successfully',
-                'metrics': self.model_info
+                'model_version': model_info.get('model_version'),
+                'promoted': self.registry.current() == model_info.get('model_version'),
+                'metrics': model_info,
+                'materialized_scores': materialized.get('scored_students', 0)
             }
             
         except Exception as e:
@@ -135,41 +225,17 @@ class MLService:
     def predict_completion_likelihood(self, student):
         """Predict completion likelihood for a student"""
         try:
-            if not self.model:
-                if not self._load_model():
-                    train_result = self.train_model()
-                    if not train_result.get('success'):
-                        return {
-                            'error': 'Model not available',
-                            'message': 'Please train the model first'
-                        }
-            
-            feature_columns = self.model_info.get('features_used', [
-                'StudyHours', 'Attendance', 'AssignmentCompletion',
-                'Discussions', 'Resources', 'StressLevel',
-                'Internet', 'EduTech', 'OnlineCourses', 'EngagementScore', 'RiskScore'
-            ])
-            
-            features = []
-            for col in feature_columns:
-                features.append(student.get(col, 0))
-            
-            features_array = np.array(features).reshape(1, -1)
-            
-            features_scaled = self.scaler.transform(features_array)
-            
-            prediction = self.model.predict(features_scaled)[0]
-            probability = self.model.predict_proba(features_scaled)[0]
+            if not self._ensure_model():
+                return {
+                    'error': 'Model not available',
+                    'message': 'Please train the model first'
+                }
             
-            completion_likelihood = probability[1] * 100
+            score = self.get_materialized_score(student.get('StudentID'))
+            if score:
+                return {key: score.get(key) for key in PREDICTION_FIELDS}
             
-            return {
-                'student_id': student.get('StudentID'),
-                'will_complete': bool(prediction),
-                'completion_likelihood': round(completion_likelihood, 2),
-                'confidence': round(max(probability) * 100, 2),
-                'risk_level': 'low' if completion_likelihood >= 70 else 'medium' if completion_likelihood >= 50 else 'high'
-            }
+            return self._predict_students([student])[0]
             
         except Exception as e:
             return {
@@ -179,12 +245,26 @@ class MLService:
     
     def batch_predict_completion(self, student_ids):
         """Predict completion for multiple students"""
+        students = self.data_service.get_students_by_ids(student_ids, fields=PROFILES['model'])
+        found = [students[str(student_id)] for student_id in student_ids if str(student_id) in students]
+        
+        scored = []
+        if found:
+            try:
+                if not self._ensure_model():
+                    error = {'error': 'Model not available', 'message': 'Please train the model first'}
+                    scored = [error] * len(found)
+                else:
+                    scored = self._predict_students(found)
+            except Exception as e:
+                scored = [{'error': str(e), 'message': 'Prediction failed'}] * len(found)
+        
+        # Results follow the order of the requested ids
+        scored = iter(scored)
         predictions = []
         for student_id in student_ids:
-            student = self.data_service.get_student_by_id(student_id)
-            if student:
-                prediction = self.predict_completion_likelihood(student)
-                predictions.append(prediction)
+            if str(student_id) in students:
+                predictions.append(next(scored))
             else:
                 predictions.append({
                     'student_id': student_id,
@@ -192,45 +272,123 @@ class MLService:
                 })
         return {'predictions': predictions}
     
+    def _ensure_model(self):
+        """Make sure a model is loaded; never trains (see services.training_jobs)"""
+        self.reload_if_changed()
+        if self.has_model:
+            return True
+        return self._load_model()
+    
+    def _feature_columns(self):
+        return self.model_info.get('features_used', [
+            'StudyHours', 'Attendance', 'AssignmentCompletion',
+            'Discussions', 'Resources', 'StressLevel',
+            'Internet', 'EduTech', 'OnlineCourses', 'EngagementScore', 'RiskScore'
+        ])
+    
+    def _feature_matrix(self, students):
+        """Build the (n_students, n_features) matrix the model was trained on"""
+        feature_columns = self._feature_columns()
+        matrix = np.zeros((len(students), len(feature_columns)), dtype=np.float64)
+        for i, student in enumerate(students):
+            for j, col in enumerate(feature_columns):
+                value = student.get(col)
+                if value is not None:
+                    matrix[i, j] = value
+        return matrix
+    
+    def _predict_students(self, students):
+        """Score many students with one scaler transform and one predict_proba call"""
+        student_ids = [student.get('StudentID') for student in students]
+        return self._predict_matrix(student_ids, self._feature_matrix(students))
+    
+    def _predict_matrix(self, student_ids, features):
+        """Score a feature matrix, one row per student"""
+        compiled = self.compiled
+        model_version = self.model_info.get('model_version')
+        if compiled is not None and len(features) <= COMPILED_MAX_ROWS:
+            classes = compiled.classes
+            probabilities = compiled.predict_proba(features)
+        else:
+            model, scaler = self._estimator()
+            classes = model.classes_
+            probabilities = model.predict_proba(scaler.transform(features))
+        # predict() is the argmax of predict_proba, so derive labels instead of a second model call
+        labels = classes[probabilities.argmax(axis=1)]
+        positive = list(classes).index(1)
+        
+        predictions = []
+        for student_id, probability, label in zip(student_ids, probabilities, labels):
+            completion_likelihood = probability[positive] * 100
+            predictions.append({
+                'student_id': student_id,
+                'will_complete': bool(label),
+                'completion_likelihood': round(completion_likelihood, 2),
+                'confidence': round(max(probability) * 100, 2),
+                'risk_level': 'low' if completion_likelihood >= 70 else 'medium' if completion_likelihood >= 50 else 'high',
+                'model_version': model_version
+            })
+        return predictions
+    
+    def _classify_dropout_risk(self, risk_score, attendance, engagement, completion_likelihood):
+        """Vectorized dropout classification: returns (levels, factor matrix)"""
+        factors = np.column_stack([
+            attendance < 50,
+            engagement < 30,
+            risk_score >= 70,
+            completion_likelihood < 40
+        ])
+        factor_count = factors.sum(axis=1)
+        levels = np.select(
+            [
+                (factor_count >= 3) | (risk_score >= 80),
+                (factor_count >= 2) | (risk_score >= 70),
+                (factor_count >= 1) | (risk_score >= 50)
+            ],
+            ['critical', 'high', 'medium'],
+            default='low'
+        )
+        return levels, factors
+    
     def assess_dropout_risk(self, student):
         """Assess dropout risk for a student"""
         try:
-
+            score = self.get_materialized_score(student.get('StudentID'))
+            if score:
+                risk_level = score['dropout_risk_level']
+                risk_factors = score['risk_factors']
+                return {
+                    'student_id': score['student_id'],
+                    'risk_level': risk_level,
+                    'risk_score': score['risk_score'],
+                    'completion_likelihood': score['completion_likelihood'],
+                    'risk_factors': risk_factors,
+                    'recommendations': self._get_risk_recommendations(risk_level, risk_factors),
+                    'model_version': score.get('model_version')
+                }
+            
             completion_pred = self.predict_completion_likelihood(student)
             
-
             risk_score = student.get('RiskScore', 0)
             attendance = student.get('Attendance', 0)
             engagement = student.get('EngagementScore', 0)
+            completion_likelihood = completion_pred.get('completion_likelihood', 0)
             
-
-            risk_factors = []
-            if attendance < 50:
-                risk_factors.append('Very low attendance')
-            if engagement < 30:
-                risk_factors.append('Very low engagement')
-            if risk_score >= 70:
-                risk_factors.append('High risk score')
-            if completion_pred.get('completion_likelihood', 0) < 40:
-                risk_factors.append('Low completion likelihood')
-            
-
-            if len(risk_factors) >= 3 or risk_score >= 80:
-                risk_level = 'critical'
-            elif len(risk_factors) >= 2 or risk_score >= 70:
-                risk_level = 'high'
-            elif len(risk_factors) >= 1 or risk_score >= 50:
-                risk_level = 'medium'
-            else:
-                risk_level = 'low'
+            levels, factors = self._classify_dropout_risk(
+                np.array([risk_score]), np.array([attendance]),
+                np.array([engagement]), np.array([completion_likelihood])
+            )
+            risk_level = str(levels[0])
+            risk_factors = [label for label, hit in zip(RISK_FACTOR_LABELS, factors[0]) if hit]
             
             return {
                 'student_id': student.get('StudentID'),
                 'risk_level': risk_level,
                 'risk_score': round(risk_score, 2),
-                'completion_likelihood': completion_pred.get('completion_likelihood', 0),
+                'completion_likelihood': completion_likelihood,
                 'risk_factors': risk_factors,
-                'recommendations': self._get_risk_recommendations(risk_level, risk_factors)
+                'recommendations': self._get_risk_recommendations(risk_level, risk_factors),
+                'model_version': completion_pred.get('model_version')
             }
             
         except Exception as e:
@@ -239,12 +397,113 @@ class MLService:
                 'message': 'Risk assessment failed'
             }
     
+    def materialize_scores(self):
+        """Score the whole cohort in one pass and store results in student_scores"""
+        try:
+            if not self.has_model and not self._load_model():
+                return {'success': False, 'message': 'Model not trained yet'}
+            
+            feature_columns = self._feature_columns()
+            risk_columns = ['RiskScore', 'Attendance', 'EngagementScore']
+            fields = list(dict.fromkeys(feature_columns + risk_columns))
+            snapshot = self.data_service.get_cohort_snapshot(fields, id_field='StudentID')
+            if not len(snapshot):
+                return {'success': True, 'scored_students': 0}
+            
+            predictions = self._predict_matrix(snapshot.ids, snapshot.matrix(feature_columns))
+            completion_likelihood = np.array([p['completion_likelihood'] for p in predictions])
+            risk_score = snapshot.column('RiskScore')
+            levels, factors = self._classify_dropout_risk(
+                risk_score, snapshot.column('Attendance'),
+                snapshot.column('EngagementScore'), completion_likelihood
+            )
+            
+            version = dataset_version.current()
+            model_trained_at = self.model_info.get('trained_at')
+            scored_at = datetime.now().isoformat()
+            score_key = {'model_trained_at': model_trained_at, 'dataset_version': version}
+            
+            operations = []
+            for i, prediction in enumerate(predictions):
+                doc = dict(prediction)
+                doc.update({
+                    'StudentID': prediction['student_id'],
+                    'dropout_risk_level': str(levels[i]),
+                    'risk_score': round(float(risk_score[i]), 2),
+                    'risk_factors': [label for label, hit in zip(RISK_FACTOR_LABELS, factors[i]) if hit],
+                    'model_trained_at': model_trained_at,
+                    'dataset_version': version,
+                    'scored_at': scored_at
+                })
+                operations.append(ReplaceOne({'StudentID': doc['StudentID'], **score_key}, doc, upsert=True))
+            
+            self._ensure_score_indexes()
+            for i in range(0, len(operations), 1000):
+                self.scores.bulk_write(operations[i:i + 1000], ordered=False)
+            # Drop only what was scored before this pass started: older versions' sets and
+            # students removed from the cohort. A pass that started later (for this or
+            # another version) keeps everything it wrote.
+            self.scores.delete_many({'scored_at': {'$lt': scored_at}})
+            
+            return {'success': True, 'scored_students': len(operations)}
+            
+        except Exception as e:
+            print(f"Error materializing scores: {e}")
+            return {'success': False, 'error': str(e), 'message': 'Score materialization failed'}
+    
+    def _ensure_score_indexes(self):
+        """Scores are keyed per student, model and dataset version, so passes can overlap"""
+        indexes = self.scores.index_information()
+        # Scores used to be unique per student only, which would reject a second version's set
+        if indexes.get('StudentID_1', {}).get('unique'):
+            self.scores.drop_index('StudentID_1')
+        self.scores.create_index(
+            [('StudentID', 1), ('model_trained_at', 1), ('dataset_version', 1)], unique=True
+        )
+        self.scores.create_index(
+            [('model_trained_at', 1), ('dataset_version', 1), ('dropout_risk_level', 1), ('risk_score', -1)]
+        )
+        self.scores.create_index('scored_at')
+    
+    def _current_score_key(self):
+        return {'model_trained_at': self.model_info.get('trained_at'), 'dataset_version': dataset_version.current()}
+    
+    def get_materialized_score(self, student_id):
+        """Get the stored score for a student, if it matches the current model and data"""
+        try:
+            self.reload_if_changed()
+            if student_id is None or self.scores is None:
+                return None
+            return self.scores.find_one({'StudentID': student_id, **self._current_score_key()}, {'_id': 0})
+        except Exception as e:
+            print(f"Error fetching materialized score: {e}")
+            return None
+    
+    def get_students_by_risk(self, risk_level, limit=100):
+        """List materialized scores for a dropout risk level, highest risk score first
+        
+        Only scores of the current model and dataset version are listed; until they
+        are materialized the list is empty.
+        """
+        self.reload_if_changed()
+        cursor = self.scores.find(
+            {'dropout_risk_level': risk_level, **self._current_score_key()}, {'_id': 0}
+        ).sort('risk_score', -1).limit(limit)
+        students = list(cursor)
+        return {
+            'risk_level': risk_level,
+            'count': len(students),
+            'model_version': self.model_info.get('model_version'),
+            'students': students
+        }
+    
     def get_model_info(self):
         """Get information about the current model"""
+        self.reload_if_changed()
         if not self.model_info:
             self._load_model()
         
-        if not self.model:
+        if not self.has_model:
             return {
                 'trained': False,
                 'message': 'Model not trained yet'
@@ -252,52 +511,204 @@ class MLService:
         
         return self.model_info
     
-    def _save_model(self):
-        """Save model to disk"""
+    def _save_model(self, parity_rows=None):
+        """Save the model as a new registry version and promote it unless MODEL_AUTO_PROMOTE is off
+        
+        A failed write or promotion is raised, so the training run is reported as failed.
+        """
         try:
-            model_path = os.path.join(self.model_dir, 'completion_model.pkl')
-            scaler_path = os.path.join(self.model_dir, 'scaler.pkl')
-            info_path = os.path.join(self.model_dir, 'model_info.pkl')
-            
-            with open(model_path, 'wb') as f:
-                pickle.dump(self.model, f)
-            
-            if self.scaler:
-                with open(scaler_path, 'wb') as f:
-                    pickle.dump(self.scaler, f)
-            
-            with open(info_path, 'wb') as f:
-                pickle.dump(self.model_info, f)
+            self.compiled = self._compile(self.model, self.scaler, parity_rows)
+            self.model_info['compiled_inference'] = self.compiled is not None
+            bundle_id = new_bundle_id()
+            self.model_info['model_version'] = bundle_id
+            
+            write_bundle(self.model_dir, bundle_id, self.model, self.scaler, self.model_info, self.compiled)
+            if MODEL_AUTO_PROMOTE:
+                self.registry.promote(bundle_id, verify=False)
+                self.bundle_id = bundle_id
+                self._loaded_signature = bundle_id
+            else:
+                # Registered for review only; keep serving the promoted version
+                print(f"Saved model version {bundle_id} without promoting it")
+                self._load_model()
             
         except Exception as e:
             print(f"Error saving model: {e}")
+            raise
+        
+        # The new version is saved and live; a failed cleanup is retried after the next run
+        try:
+            deleted = self.registry.prune()
+            if deleted:
+                print(f"Removed {len(deleted)} old model versions")
+        except Exception as e:
+            print(f"Error removing old model versions: {e}")
     
-    def _load_model(self):
-        """Load model from disk"""
+    def _compile(self, model, scaler, parity_rows=None):
+        """Compile a model and its scaler, if the result matches sklearn
+        
+        Parity is checked on synthetic rows around the split thresholds and, when
+        given, on real feature rows (e.g. the held-out test split).
+        """
         try:
-            model_path = os.path.join(self.model_dir, 'completion_model.pkl')
-            scaler_path = os.path.join(self.model_dir, 'scaler.pkl')
-            info_path = os.path.join(self.model_dir, 'model_info.pkl')
-            
-            if os.path.exists(model_path):
-                with open(model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                
-                if os.path.exists(scaler_path):
-                    with open(scaler_path, 'rb') as f:
-                        self.scaler = pickle.load(f)
-                
-                if os.path.exists(info_path):
-                    with open(info_path, 'rb') as f:
-                        self.model_info = pickle.load(f)
-                
-                return True
+            compiled = compile_model(model, scaler)
+            error = check_parity(compiled, model, scaler)
+            if parity_rows is not None and len(parity_rows):
+                error = max(error, check_parity(compiled, model, scaler, np.asarray(parity_rows, dtype=np.float64)))
+            if error > PARITY_TOLERANCE:
+                print(f"Compiled model differs from sklearn by {error}, using sklearn for inference")
+                return None
+            return compiled
+        except Exception as e:
+            print(f"Error compiling model: {e}")
+            return None
+    
+    def _legacy_paths(self):
+        """Pickle files written before model bundles; still loaded if no bundle is published"""
+        return (
+            os.path.join(self.model_dir, 'completion_model.pkl'),
+            os.path.join(self.model_dir, 'scaler.pkl'),
+            os.path.join(self.model_dir, 'model_info.pkl')
+        )
+    
+    def _model_signature(self):
+        """Current bundle id, else (mtime, size) of each legacy file; None if there is no model"""
+        bundle_id = current_bundle_id(self.model_dir)
+        if bundle_id:
+            return bundle_id
+        signature = []
+        for path in self._legacy_paths():
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature) if signature[0] else None
+    
+    def reload_if_changed(self):
+        """Reload the model if another bundle was published since it was loaded"""
+        now = time.monotonic()
+        if now - self._reload_checked_at < self.reload_check_interval:
             return False
+        self._reload_checked_at = now
+        
+        signature = self._model_signature()
+        if signature is None or signature == self._loaded_signature:
+            return False
+        print("Model changed on disk, reloading model")
+        return self._load_model()
+    
+    def _load_model(self):
+        """Load the current bundle, or the legacy pickle files if none is published"""
+        try:
+            bundle_id = current_bundle_id(self.model_dir)
+            if bundle_id:
+                return self._load_bundle(bundle_id)
+            return self._load_legacy_model()
             
         except Exception as e:
             print(f"Error loading model: {e}")
             return False
     
+    def _load_bundle(self, bundle_id):
+        """Verify a bundle and map its compiled arrays; the sklearn estimator loads on first use"""
+        manifest = read_manifest(self.model_dir, bundle_id)
+        compiled = load_compiled(self.model_dir, manifest)
+        
+        # Swap under the estimator lock so a model and scaler always come from the same bundle
+        with self._estimator_lock:
+            self._model, self._scaler = None, None
+            self._pending_bundle = bundle_id
+            self.model_info = manifest['model_info']
+            self.compiled = compiled
+            self.bundle_id = bundle_id
+            self._loaded_signature = bundle_id
+        
+        if compiled is None:
+            # sklearn serves every request, so load it now rather than in the first one
+            self._estimator()
+        return True
+    
+    def _load_legacy_model(self):
+        model_path, scaler_path, info_path = self._legacy_paths()
+        
+        if not os.path.exists(model_path):
+            return False
+        
+        signature = self._model_signature()
+        # Load everything before swapping so requests never see a half-loaded model
+        with open(model_path, 'rb') as f:
+            model = pickle.load(f)
+        
+        scaler = self._scaler
+        if os.path.exists(scaler_path):
+            with open(scaler_path, 'rb') as f:
+                scaler = pickle.load(f)
+        
+        model_info = self.model_info
+        if os.path.exists(info_path):
+            with open(info_path, 'rb') as f:
+                model_info = pickle.load(f)
+        
+        compiled = self._compile(model, scaler)
+        
+        with self._estimator_lock:
+            self._model, self._scaler, self._pending_bundle = model, scaler, None
+            self.model_info = model_info
+            self.compiled = compiled
+            self.bundle_id = None
+            self._loaded_signature = signature
+        return True
+    
+    def list_models(self):
+        """Registered model versions, newest first, and the promotion history"""
+        self.reload_if_changed()
+        return {
+            'current_version': self.registry.current(),
+            'loaded_version': self.bundle_id,
+            'versions': self.registry.versions(),
+            'promotions': self.registry.history()
+        }
+    
+    def get_model_version(self, version):
+        return self.registry.get(version)
+    
+    def promote_model(self, version):
+        """Serve a registered version; other workers switch on their next reload check"""
+        try:
+            previous = self.registry.current()
+            summary = self.registry.promote(version)
+            return self._after_promotion(summary, previous)
+        except BundleError as e:
+            return {'success': False, 'error': str(e), 'message': 'Model promotion failed'}
+    
+    def rollback_model(self):
+        """Serve the version promoted before the current one"""
+        try:
+            previous = self.registry.current()
+            summary = self.registry.rollback()
+            if summary is None:
+                return {'success': False, 'message': 'No earlier promoted model version to roll back to'}
+            return self._after_promotion(summary, previous)
+        except BundleError as e:
+            return {'success': False, 'error': str(e), 'message': 'Model rollback failed'}
+    
+    def _after_promotion(self, summary, previous):
+        """Load the promoted version here and re-score the cohort in the background"""
+        if not self._load_model():
+            return {'success': False, 'message': f"Promoted {summary['model_version']} but could not load it"}
+        # Stored scores belong to the previous model and are ignored until the new pass lands
+        if self._rescore_pool is None:
+            self._rescore_pool = ThreadPoolExecutor(max_workers=1)
+        self._rescore_pool.submit(self.materialize_scores)
+        return {
+            'success': True,
+            'model_version': summary['model_version'],
+            'previous_version': previous,
+            'rescoring': True,
+            'model': summary
+        }
+    
     def _get_risk_recommendations(self, risk_level, risk_factors):
         """Get recommendations based on risk level"""
         recommendations = []
@@ -0,0 +1,197 @@
+"""
+Model artifact bundles
+
+A trained model is saved as one bundle directory under models/bundles/:
+
+    manifest.json      format, bundle id, feature list, model_info, and the
+                       sha256 and size of every other file
+    estimator.joblib   sklearn estimator and scaler, uncompressed so its arrays
+                       can be memory-mapped
+    compiled/*.npy     CompiledModel arrays (services.compiled_model), plain .npy
+
+The bundle is written to a temporary directory and renamed into place, and
+models/current, a one-line file naming the live bundle, is replaced with
+os.replace. A reader therefore sees either the old bundle or the new one, never
+a new model with an old scaler. Arrays are loaded with mmap, so every worker
+on a host shares one copy through the page cache. The .npy files load without
+unpickling; the estimator is unpickled only when sklearn is actually needed.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import uuid
+from datetime import datetime
+import joblib
+import numpy as np
+from services.compiled_model import CompiledModel
+
+BUNDLE_FORMAT = 1
+BUNDLES_DIR = 'bundles'
+CURRENT_POINTER = 'current'
+MANIFEST_FILE = 'manifest.json'
+ESTIMATOR_FILE = 'estimator.joblib'
+COMPILED_DIR = 'compiled'
+
+# Bundles kept besides the current one and any protected ones (see ModelRegistry.prune)
+MODEL_KEEP_BUNDLES = int(os.getenv('MODEL_KEEP_BUNDLES', 3))
+MODEL_VERIFY_CHECKSUM = os.getenv('MODEL_VERIFY_CHECKSUM', 'true').lower() == 'true'
+
+
+class BundleError(Exception):
+    """A bundle is missing, incomplete, or fails its checksum"""
+
+
+def new_bundle_id():
+    """Sortable, unique id: creation time plus a random suffix"""
+    return f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def bundle_path(model_dir, bundle_id):
+    return os.path.join(model_dir, BUNDLES_DIR, bundle_id)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fsync(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _bundle_checksum(files):
+    """One checksum over every file's name and sha256"""
+    lines = ''.join(f"{name} {files[name]['sha256']}\n" for name in sorted(files))
+    return hashlib.sha256(lines.encode()).hexdigest()
+
+
+def write_bundle(model_dir, bundle_id, model, scaler, model_info, compiled=None):
+    """Write a complete bundle under its final name; returns its manifest"""
+    bundles = os.path.join(model_dir, BUNDLES_DIR)
+    temp = os.path.join(bundles, f'.tmp-{bundle_id}')
+    os.makedirs(os.path.join(temp, COMPILED_DIR), exist_ok=True)
+    try:
+        names = [ESTIMATOR_FILE]
+        joblib.dump({'model': model, 'scaler': scaler}, os.path.join(temp, ESTIMATOR_FILE))
+        if compiled is not None:
+            for name, array in compiled.to_arrays().items():
+                relative = f'{COMPILED_DIR}/{name}.npy'
+                np.save(os.path.join(temp, relative), np.asarray(array), allow_pickle=False)
+                names.append(relative)
+
+        files = {}
+        for name in names:
+            path = os.path.join(temp, name)
+            _fsync(path)
+            files[name] = {'sha256': _sha256(path), 'bytes': os.path.getsize(path)}
+
+        manifest = {
+            'format': BUNDLE_FORMAT,
+            'bundle_id': bundle_id,
+            'created_at': datetime.now().isoformat(),
+            'features': model_info.get('features_used', []),
+            'compiled': compiled is not None,
+            'files': files,
+            'checksum': _bundle_checksum(files),
+            'model_info': model_info
+        }
+        with open(os.path.join(temp, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.rename(temp, bundle_path(model_dir, bundle_id))
+        return manifest
+    except Exception:
+        shutil.rmtree(temp, ignore_errors=True)
+        raise
+
+
+def publish(model_dir, bundle_id):
+    """Point models/current at bundle_id in one atomic replace"""
+    pointer = os.path.join(model_dir, CURRENT_POINTER)
+    temp = f'{pointer}.{uuid.uuid4().hex[:6]}.tmp'
+    with open(temp, 'w') as f:
+        f.write(bundle_id + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, pointer)
+
+
+def current_bundle_id(model_dir):
+    """Bundle named by models/current, or None if nothing has been published"""
+    try:
+        with open(os.path.join(model_dir, CURRENT_POINTER)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest(model_dir, bundle_id, verify=MODEL_VERIFY_CHECKSUM):
+    """Manifest of a bundle; with verify, every file is checked against its sha256"""
+    directory = bundle_path(model_dir, bundle_id)
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise BundleError(f"Bundle {bundle_id} has no readable manifest: {e}")
+
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise BundleError(f"Bundle {bundle_id} has unsupported format {manifest.get('format')}")
+    files = manifest.get('files', {})
+    if _bundle_checksum(files) != manifest.get('checksum'):
+        raise BundleError(f"Bundle {bundle_id} manifest checksum mismatch")
+    for name, expected in files.items():
+        path = os.path.join(directory, name)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            raise BundleError(f"Bundle {bundle_id} is missing {name}")
+        if size != expected['bytes'] or (verify and _sha256(path) != expected['sha256']):
+            raise BundleError(f"Bundle {bundle_id} file {name} does not match its checksum")
+    return manifest
+
+
+def load_compiled(model_dir, manifest):
+    """CompiledModel backed by memory-mapped .npy files, or None if the bundle has none"""
+    if not manifest.get('compiled'):
+        return None
+    directory = bundle_path(model_dir, manifest['bundle_id'])
+    arrays = {}
+    for name in manifest['files']:
+        if name.startswith(f'{COMPILED_DIR}/'):
+            field = name[len(COMPILED_DIR) + 1:-len('.npy')]
+            arrays[field] = np.load(os.path.join(directory, name), mmap_mode='r', allow_pickle=False)
+    return CompiledModel.from_arrays(arrays)
+
+
+def load_estimator(model_dir, bundle_id):
+    """(model, scaler) from a bundle, with their arrays memory-mapped"""
+    estimator = joblib.load(os.path.join(bundle_path(model_dir, bundle_id), ESTIMATOR_FILE), mmap_mode='r')
+    return estimator['model'], estimator['scaler']
+
+
+def prune_bundles(model_dir, keep=MODEL_KEEP_BUNDLES, protected=()):
+    """Delete all but the current bundle, protected ones and the newest `keep` others; returns the deleted ids"""
+    bundles = os.path.join(model_dir, BUNDLES_DIR)
+    if not os.path.isdir(bundles):
+        return []
+    current = current_bundle_id(model_dir)
+    others = sorted(
+        (name for name in os.listdir(bundles)
+         if not name.startswith('.') and name != current and name not in protected),
+        reverse=True
+    )
+    deleted = others[keep:]
+    for name in deleted:
+        shutil.rmtree(os.path.join(bundles, name), ignore_errors=True)
+    return deleted
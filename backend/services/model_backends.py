@@ -0,0 +1,231 @@
+"""
+Estimator backends for the completion model
+
+MODEL_BACKEND picks the classifier MLService.train_model fits:
+
+- hist_gradient_boosting (default): sklearn's histogram-based gradient boosting.
+  It bins features once and builds trees over the bins on all cores, which makes
+  it much faster than the exact implementation on large cohorts.
+- gradient_boosting: the original single-threaded GradientBoostingClassifier.
+
+hist_gradient_boosting stops adding trees once a held-out validation split stops
+improving; gradient_boosting keeps its original fixed 100 stages. MODEL_EARLY_STOPPING
+overrides that per-backend default. With MODEL_SEARCH=true the hyperparameters come
+from a randomized, cross-validated search whose candidate fits run in parallel
+(MODEL_N_JOBS, -1 for every core).
+
+fit_estimator reports progress as the final fit advances: after every stage of
+gradient_boosting, and after each of MODEL_PROGRESS_STEPS warm-started increments
+of hist_gradient_boosting, which has no per-iteration callback. With a search it
+also reports after every batch of candidates.
+"""
+
+import os
+import math
+import time
+import numpy as np
+from joblib import effective_n_jobs
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier
+from sklearn.model_selection import GridSearchCV, ParameterSampler
+from sklearn.inspection import permutation_importance
+
+MODEL_BACKEND = os.getenv('MODEL_BACKEND', 'hist_gradient_boosting')
+# Unset: each backend's own default (see BACKENDS)
+MODEL_EARLY_STOPPING = os.getenv('MODEL_EARLY_STOPPING', '').lower() or None
+if MODEL_EARLY_STOPPING is not None:
+    MODEL_EARLY_STOPPING = MODEL_EARLY_STOPPING == 'true'
+MODEL_SEARCH = os.getenv('MODEL_SEARCH', 'false').lower() == 'true'
+MODEL_SEARCH_ITERATIONS = int(os.getenv('MODEL_SEARCH_ITERATIONS', 12))
+MODEL_CV_FOLDS = int(os.getenv('MODEL_CV_FOLDS', 3))
+MODEL_N_JOBS = int(os.getenv('MODEL_N_JOBS', -1))
+# Warm-started increments a histogram boosting fit is split into for progress reports.
+# Each resume re-bins the data and re-predicts the trees so far, so keep this small.
+MODEL_PROGRESS_STEPS = max(1, int(os.getenv('MODEL_PROGRESS_STEPS', 4)))
+
+
+def _gradient_boosting(early_stopping):
+    options = {'n_iter_no_change': 10, 'validation_fraction': 0.1} if early_stopping else {}
+    return GradientBoostingClassifier(
+        n_estimators=100,
+        learning_rate=0.1,
+        max_depth=5,
+        random_state=42,
+        **options
+    )
+
+
+def _hist_gradient_boosting(early_stopping):
+    return HistGradientBoostingClassifier(
+        max_iter=200,
+        learning_rate=0.1,
+        max_depth=5,
+        early_stopping=early_stopping,
+        validation_fraction=0.1,
+        n_iter_no_change=10,
+        random_state=42
+    )
+
+
+BACKENDS = {
+    'gradient_boosting': {
+        'build': _gradient_boosting,
+        'early_stopping': False,
+        'search_space': {
+            'learning_rate': [0.03, 0.05, 0.1, 0.2],
+            'max_depth': [3, 4, 5, 6],
+            'subsample': [0.7, 0.85, 1.0],
+            'min_samples_leaf': [1, 5, 20]
+        }
+    },
+    'hist_gradient_boosting': {
+        'build': _hist_gradient_boosting,
+        'early_stopping': True,
+        'search_space': {
+            'learning_rate': [0.03, 0.05, 0.1, 0.2],
+            'max_depth': [3, 4, 5, 6, None],
+            'max_leaf_nodes': [15, 31, 63],
+            'min_samples_leaf': [10, 20, 50],
+            'l2_regularization': [0.0, 0.1, 1.0]
+        }
+    }
+}
+
+
+def build_estimator(backend=MODEL_BACKEND, early_stopping=MODEL_EARLY_STOPPING):
+    """An unfitted classifier for backend; raises ValueError for unknown backends"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown MODEL_BACKEND '{backend}', expected one of {', '.join(BACKENDS)}")
+    if early_stopping is None:
+        early_stopping = BACKENDS[backend]['early_stopping']
+    return BACKENDS[backend]['build'](early_stopping)
+
+
+def _stopped_early(estimator):
+    """Whether a fitted histogram boosting model's early-stopping rule says stop
+
+    The estimator checks this after each iteration but not when a warm start
+    resumes, so an increment that ends exactly where the rule fires must stop here.
+    """
+    if not estimator.do_early_stopping_:
+        return False
+    scores = estimator.validation_score_ if len(estimator.validation_score_) else estimator.train_score_
+    reference = estimator.n_iter_no_change + 1
+    if len(scores) < reference:
+        return False
+    tol = estimator.tol or 0
+    return not any(score > scores[-reference] + tol for score in scores[-reference + 1:])
+
+
+def _fit_hist(estimator, X, y, progress):
+    """Fit in MODEL_PROGRESS_STEPS warm-started increments; the model equals one full fit"""
+    total = estimator.max_iter
+    step = math.ceil(total / MODEL_PROGRESS_STEPS)
+    warm_start = estimator.warm_start
+    estimator.set_params(warm_start=True)
+    try:
+        for max_iter in range(step, total + step, step):
+            estimator.set_params(max_iter=min(max_iter, total))
+            estimator.fit(X, y)
+            progress(estimator.n_iter_ / total)
+            if estimator.n_iter_ < estimator.max_iter or _stopped_early(estimator):
+                break
+    finally:
+        estimator.set_params(warm_start=warm_start, max_iter=total)
+
+
+def _fit(estimator, X, y, progress):
+    """Fit estimator, calling progress(fraction) as its boosting iterations advance"""
+    if isinstance(estimator, GradientBoostingClassifier):
+        def monitor(stage, fitted, _locals):
+            progress((stage + 1) / fitted.n_estimators)
+            return False
+        estimator.fit(X, y, monitor=monitor)
+    elif isinstance(estimator, HistGradientBoostingClassifier):
+        _fit_hist(estimator, X, y, progress)
+    else:
+        estimator.fit(X, y)
+    progress(1.0)
+
+
+def _search(estimator, X, y, backend, progress):
+    """Randomized cross-validated search; returns (best params, details for model_info)
+
+    The candidates are those RandomizedSearchCV would draw, evaluated in batches
+    that keep MODEL_N_JOBS cores busy, with progress(fraction) after each batch.
+    """
+    candidates = list(ParameterSampler(
+        BACKENDS[backend]['search_space'], MODEL_SEARCH_ITERATIONS, random_state=42
+    ))
+    batch_size = max(1, effective_n_jobs(MODEL_N_JOBS))
+    scores = []
+    for start in range(0, len(candidates), batch_size):
+        batch = candidates[start:start + batch_size]
+        searcher = GridSearchCV(
+            estimator,
+            [{name: [value] for name, value in params.items()} for params in batch],
+            cv=MODEL_CV_FOLDS,
+            scoring='f1',
+            n_jobs=MODEL_N_JOBS,
+            refit=False
+        )
+        searcher.fit(X, y)
+        scores.extend(searcher.cv_results_['mean_test_score'])
+        progress(len(scores) / len(candidates))
+
+    # Failed candidates score NaN and rank last; ties go to the first drawn, as in sklearn
+    best = int(np.argmax(np.nan_to_num(np.asarray(scores, dtype=float), nan=-np.inf)))
+    score = float(scores[best])
+    return candidates[best], {
+        'best_params': candidates[best],
+        # NaN when every candidate failed (e.g. a fold without positives); not valid JSON
+        'cv_f1_score': round(score, 4) if math.isfinite(score) else None,
+        'candidates': len(candidates),
+        'cv_folds': MODEL_CV_FOLDS
+    }
+
+
+def fit_estimator(X, y, backend=MODEL_BACKEND, search=MODEL_SEARCH, progress=None):
+    """Fit a classifier on X, y; returns (estimator, details for model_info)
+
+    progress, if given, is called as progress(fraction, stage) while the fit runs.
+    A search is reported as the first 80% and the refit of the best candidate as
+    the rest.
+    """
+    progress = progress or (lambda fraction, stage: None)
+    estimator = build_estimator(backend)
+    details = {'backend': backend, 'search': None}
+    started = time.perf_counter()
+
+    if search:
+        best_params, details['search'] = _search(
+            estimator, X, y, backend, lambda fraction: progress(0.8 * fraction, 'searching')
+        )
+        estimator = clone(estimator).set_params(**best_params)
+        _fit(estimator, X, y, lambda fraction: progress(0.8 + 0.2 * fraction, 'fitting'))
+    else:
+        _fit(estimator, X, y, lambda fraction: progress(fraction, 'fitting'))
+
+    details['fit_seconds'] = round(time.perf_counter() - started, 3)
+    details['boosting_iterations'] = int(
+        getattr(estimator, 'n_iter_', None) or getattr(estimator, 'n_estimators_', 0)
+    )
+    return estimator, details
+
+
+def feature_importance(estimator, features, X_test, y_test):
+    """Importance of each feature, summing to 1
+
+    Uses the impurity-based importances where the estimator has them, otherwise the
+    drop in accuracy when a feature is shuffled (permutation importance).
+    """
+    importances = getattr(estimator, 'feature_importances_', None)
+    if importances is None:
+        result = permutation_importance(
+            estimator, X_test, y_test, n_repeats=3, random_state=42, n_jobs=MODEL_N_JOBS
+        )
+        importances = result.importances_mean.clip(min=0)
+        total = importances.sum()
+        if total > 0:
+            importances = importances / total
+    return dict(zip(features, (float(value) for value in importances)))
@@ -0,0 +1,181 @@
+"""
+Model registry
+
+Every training run is saved as a new model version: a bundle
+(services.model_artifacts) whose manifest records the metrics, features used,
+dataset version it was trained on and fit time. The version id is the bundle id.
+
+The promoted version is the one models/current points to. Promoting another
+version, or rolling back, only replaces that pointer, so serving workers switch
+through MLService.reload_if_changed within MODEL_RELOAD_CHECK_INTERVAL seconds,
+without a restart. Promotions are kept as a stack in models/promotions.json:
+rollback pops the current version and promotes the one before it.
+
+Promote, rollback and prune read the history, move the pointer and write the
+history back under an exclusive lock on models/registry.lock (fcntl.flock), so
+concurrent promotions from several workers or hosts sharing the directory
+cannot lose each other's entries. Where fcntl is unavailable (Windows) only
+threads of one process are serialized.
+"""
+
+import os
+import json
+import uuid
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+from services.model_artifacts import (
+    BUNDLES_DIR, BundleError, bundle_path, current_bundle_id, prune_bundles, publish, read_manifest
+)
+
+PROMOTIONS_FILE = 'promotions.json'
+LOCK_FILE = 'registry.lock'
+# Promotions remembered for rollback; their versions are never pruned
+PROMOTION_HISTORY = 20
+
+# Whether a newly trained version is promoted right away
+MODEL_AUTO_PROMOTE = os.getenv('MODEL_AUTO_PROMOTE', 'true').lower() == 'true'
+
+SUMMARY_FIELDS = [
+    'trained_at', 'dataset_version', 'backend', 'fit_seconds', 'boosting_iterations',
+    'training_samples', 'test_samples', 'compiled_inference'
+]
+METRIC_FIELDS = ['accuracy', 'precision', 'recall', 'f1_score']
+
+
+class ModelRegistry:
+    """Versions saved under models/bundles and the promotion history"""
+
+    def __init__(self, model_dir):
+        self.model_dir = model_dir
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+
+    def current(self):
+        return current_bundle_id(self.model_dir)
+
+    def versions(self):
+        """Summary of every version, newest first"""
+        bundles = os.path.join(self.model_dir, BUNDLES_DIR)
+        if not os.path.isdir(bundles):
+            return []
+        summaries = []
+        for version in sorted(os.listdir(bundles), reverse=True):
+            if version.startswith('.'):
+                continue
+            summary = self.get(version)
+            if summary:
+                summaries.append(summary)
+        return summaries
+
+    def get(self, version):
+        """Summary of one version, or None if it does not exist or is unreadable"""
+        if not self._valid_name(version):
+            return None
+        try:
+            manifest = read_manifest(self.model_dir, version, verify=False)
+        except BundleError:
+            return None
+        return self._summary(manifest)
+
+    def promote(self, version, verify=True):
+        """Make version the serving model; raises BundleError if it is missing or corrupt"""
+        if not self._valid_name(version):
+            raise BundleError(f"Unknown model version {version}")
+        manifest = read_manifest(self.model_dir, version, verify=verify)
+        with self._locked():
+            history = self._history()
+            # The pointer may predate the history (e.g. models saved before the registry)
+            current = self.current()
+            if current and (not history or history[-1]['version'] != current):
+                history.append({'version': current, 'promoted_at': None})
+            history.append({'version': version, 'promoted_at': datetime.now().isoformat()})
+            publish(self.model_dir, version)
+            self._save_history(history[-PROMOTION_HISTORY:])
+        return self._summary(manifest)
+
+    def rollback(self):
+        """Promote the version promoted before the current one; returns it, or None if there is none"""
+        with self._locked():
+            history = self._history()
+            current = self.current()
+            while history and history[-1]['version'] == current:
+                history.pop()
+            while history:
+                version = history[-1]['version']
+                try:
+                    manifest = read_manifest(self.model_dir, version)
+                except BundleError as e:
+                    print(f"Skipping model version {version} in rollback: {e}")
+                    history.pop()
+                    continue
+                publish(self.model_dir, version)
+                self._save_history(history)
+                return self._summary(manifest)
+            return None
+
+    def history(self):
+        """Promotions, most recent first"""
+        return list(reversed(self._history()))
+
+    def prune(self):
+        """Delete old versions, keeping the promotion history; returns the deleted ids"""
+        with self._locked():
+            return prune_bundles(self.model_dir, protected={entry['version'] for entry in self._history()})
+
+    def _summary(self, manifest):
+        info = manifest.get('model_info', {})
+        summary = {
+            'model_version': manifest['bundle_id'],
+            'created_at': manifest.get('created_at'),
+            'promoted': manifest['bundle_id'] == self.current(),
+            'metrics': {field: info.get(field) for field in METRIC_FIELDS},
+            'features_used': manifest.get('features', [])
+        }
+        summary.update({field: info.get(field) for field in SUMMARY_FIELDS})
+        return summary
+
+    def _valid_name(self, version):
+        # Version ids come from URLs; keep them inside the bundles directory
+        return bool(version) and os.path.basename(version) == version and not version.startswith('.') \
+            and os.path.isdir(bundle_path(self.model_dir, version))
+
+    @contextmanager
+    def _locked(self):
+        """Hold the registry lock; re-entrant within this registry"""
+        with self._thread_lock:
+            handle = None
+            if self._lock_depth == 0 and fcntl is not None:
+                os.makedirs(self.model_dir, exist_ok=True)
+                handle = open(os.path.join(self.model_dir, LOCK_FILE), 'a')
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if handle is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+                    handle.close()
+
+    def _history_path(self):
+        return os.path.join(self.model_dir, PROMOTIONS_FILE)
+
+    def _history(self):
+        try:
+            with open(self._history_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _save_history(self, history):
+        with self._locked():
+            path = self._history_path()
+            temp = f'{path}.{uuid.uuid4().hex[:6]}.tmp'
+            with open(temp, 'w') as f:
+                json.dump(history, f, indent=2)
+            os.replace(temp, path)
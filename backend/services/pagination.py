@@ -0,0 +1,75 @@
+"""
+Opaque cursor tokens for keyset pagination
+
+A token is the URL-safe base64 of a small JSON position, e.g. {"after": <_id>}
+for the student list or {"offset": 400} inside a ranked search result. Clients
+pass back pagination.next unchanged and never build tokens themselves.
+"""
+
+import os
+import base64
+import json
+from bson import ObjectId
+from services.search import normalize
+
+DEFAULT_PAGE_LIMIT = 200
+# Largest page a client may ask for; the dashboard loads 2000 students in one page
+MAX_PAGE_LIMIT = int(os.getenv('MAX_PAGE_LIMIT', 2000))
+
+
+def encode_cursor(position):
+    """Encode a position dict as an opaque token"""
+    raw = json.dumps(position, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a token from encode_cursor; raises ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        position = json.loads(raw)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(position, dict):
+        raise ValueError('Invalid cursor')
+    if 'after' in position and not ObjectId.is_valid(position['after']):
+        raise ValueError('Invalid cursor')
+    if 'offset' in position and not (isinstance(position['offset'], int) and position['offset'] >= 0):
+        raise ValueError('Invalid cursor')
+    return position
+
+
+def read_cursor(token, search=''):
+    """Decode the cursor query parameter of /api/students (None when absent)
+
+    List pages carry an _id position and search pages an offset, so a token
+    from one cannot be replayed against the other.
+    """
+    if not token:
+        return None
+    position = decode_cursor(token)
+    if ('offset' if normalize(search) else 'after') not in position:
+        raise ValueError('Cursor does not match this query')
+    return position
+
+
+def read_limit(args, default=DEFAULT_PAGE_LIMIT):
+    """limit query parameter, between 1 and MAX_PAGE_LIMIT; raises ValueError otherwise"""
+    try:
+        limit = int(args.get('limit', default))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        raise ValueError(f'limit must be between 1 and {MAX_PAGE_LIMIT}')
+    return limit
+
+
+def read_page_args(args):
+    """page and limit query parameters of /api/students; raises ValueError if out of range"""
+    try:
+        page = int(args.get('page', 1))
+    except ValueError:
+        raise ValueError('page must be an integer')
+    if page < 1:
+        raise ValueError('page must be at least 1')
+    return page, read_limit(args)
@@ -0,0 +1,79 @@
+"""
+Named field projections for student queries
+
+Student documents carry every raw column plus the derived features, but most
+callers need a handful of them. Each profile names the fields a kind of caller
+reads, so MongoDB sends (and PyMongo decodes) only those. None means the full
+document.
+"""
+
+import re
+from services.cohort_summary import SUMMARY_FIELDS
+from services.search import SEARCH_KEYS_FIELD, RESPONSE_PROJECTION
+
+PROFILES = {
+    # Student tables: who the student is and how they are doing
+    'list': ['StudentID', 'Name', 'FinalGrade', 'RiskScore'],
+    # Cohort statistics and trend charts
+    'analytics': ['StudentID'] + SUMMARY_FIELDS,
+    # Training and scoring the completion model
+    'model': [
+        'StudentID', 'FinalGrade', 'StudyHours', 'Attendance', 'AssignmentCompletion',
+        'Discussions', 'Resources', 'StressLevel', 'Internet', 'EduTech', 'OnlineCourses',
+        'EngagementScore', 'RiskScore', 'Consistency'
+    ],
+    # Student detail pages and per-student insights
+    'detail': None,
+}
+
+FIELD_NAME = re.compile(r'^[A-Za-z][A-Za-z0-9_]*$')
+MAX_FIELDS = 50
+
+
+def response_stages(fields):
+    """Aggregation stages shaping students for API responses (fields None for all)
+
+    _id becomes a string id inside MongoDB, so documents need no conversion in Python.
+    """
+    if fields is None:
+        return [
+            {'$addFields': {'id': {'$toString': '$_id'}}},
+            {'$project': {'_id': 0, **RESPONSE_PROJECTION}}
+        ]
+    projection = {field: 1 for field in fields if field != 'id'}
+    return [{'$project': {'_id': 0, 'id': {'$toString': '$_id'}, **projection}}]
+
+
+def search_fields(fields):
+    """Fields for search candidates, which are ranked by StudentID and Name"""
+    if fields is None:
+        return None
+    return list(dict.fromkeys(fields + ['StudentID', 'Name']))
+
+
+def trim_fields(student, fields):
+    """Drop fields fetched only for ranking"""
+    if fields is None:
+        return student
+    return {key: value for key, value in student.items() if key == 'id' or key in fields}
+
+
+def parse_fields(value):
+    """Resolve a fields= parameter: a profile name or comma-separated field names
+
+    Returns None (full document) when the parameter is absent. Raises ValueError for
+    unknown profiles or invalid field names.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value in PROFILES:
+        return PROFILES[value]
+
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    if not fields or len(fields) > MAX_FIELDS:
+        raise ValueError(f"fields must name a profile ({', '.join(PROFILES)}) or 1-{MAX_FIELDS} fields")
+    for field in fields:
+        if not FIELD_NAME.match(field) or field == SEARCH_KEYS_FIELD:
+            raise ValueError(f"Invalid field name: {field}")
+    return list(dict.fromkeys(fields))
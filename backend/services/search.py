@@ -0,0 +1,100 @@
+"""
+Prefix search over students for the Students page autocomplete
+
+Every student document carries SearchKeys: its StudentID, its full Name and
+each word of the Name, lowercased and accent-folded. A search is an anchored
+regex on that multikey field, which MongoDB answers with an index range scan
+instead of a collection scan. Matches are ranked in Python and capped at
+SEARCH_CANDIDATE_LIMIT, so a short prefix still returns in bounded time.
+"""
+
+import os
+import re
+import unicodedata
+from pymongo import UpdateOne
+
+SEARCH_KEYS_FIELD = 'SearchKeys'
+
+# Students returned by the API do not need their search keys
+RESPONSE_PROJECTION = {SEARCH_KEYS_FIELD: 0}
+
+SEARCH_CANDIDATE_LIMIT = int(os.getenv('SEARCH_CANDIDATE_LIMIT', 500))
+SEARCH_MAX_TIME_MS = int(os.getenv('SEARCH_MAX_TIME_MS', 500))
+
+
+def normalize(text):
+    """Lowercase, strip accents and collapse whitespace"""
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.lower().split())
+
+
+def search_keys(student):
+    """Normalized keys a student can be found by"""
+    keys = []
+    for value in (student.get('StudentID'), student.get('Name')):
+        key = normalize(value)
+        if key:
+            keys.append(key)
+            keys.extend(key.split(' '))
+    return sorted(set(keys))
+
+
+def build_search_queries(term):
+    """Exact and anchored prefix queries on the search keys (None if the term is blank)
+
+    The exact query runs first so exact matches are never cut off by the candidate limit.
+    """
+    term = normalize(term)
+    if not term:
+        return None
+    return [
+        {SEARCH_KEYS_FIELD: term},
+        {SEARCH_KEYS_FIELD: {'$regex': '^' + re.escape(term)}}
+    ]
+
+
+def rank(student, term):
+    """Sort key: exact ID, exact name, ID prefix, name prefix, then name word prefix"""
+    term = normalize(term)
+    student_id = normalize(student.get('StudentID'))
+    name = normalize(student.get('Name'))
+    if student_id == term:
+        tier = 0
+    elif name == term:
+        tier = 1
+    elif student_id.startswith(term):
+        tier = 2
+    elif name.startswith(term):
+        tier = 3
+    else:
+        tier = 4
+    return (tier, len(name), student_id)
+
+
+def rank_matches(exact, prefix, term):
+    """Merge exact and prefix matches, best first, capped at SEARCH_CANDIDATE_LIMIT"""
+    candidates = {}
+    for student in exact + prefix:
+        candidates.setdefault(student['id'], student)
+    ranked = sorted(candidates.values(), key=lambda student: rank(student, term))
+    return ranked[:SEARCH_CANDIDATE_LIMIT]
+
+
+def backfill_search_keys(collection, batch_size=1000):
+    """Add SearchKeys to students loaded before search keys existed"""
+    missing = collection.find(
+        {SEARCH_KEYS_FIELD: {'$exists': False}}, {'StudentID': 1, 'Name': 1}
+    )
+    updated = 0
+    batch = []
+    for student in missing:
+        batch.append(UpdateOne(
+            {'_id': student['_id']}, {'$set': {SEARCH_KEYS_FIELD: search_keys(student)}}
+        ))
+        if len(batch) >= batch_size:
+            updated += collection.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        updated += collection.bulk_write(batch, ordered=False).modified_count
+    return updated
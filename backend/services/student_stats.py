@@ -0,0 +1,151 @@
+"""
+Overall student statistics for the /api/students/stats endpoint
+
+Totals, averages, ranges and the risk distribution come from one $facet
+aggregation, so the collection is scanned once per request. Percentiles are
+optional and use $percentile where the server supports it.
+"""
+
+AVERAGE_FIELDS = {
+    'final_grade': 'FinalGrade',
+    'exam_score': 'ExamScore',
+    'study_hours': 'StudyHours',
+    'attendance': 'Attendance',
+    'engagement_score': 'EngagementScore'
+}
+
+PERCENTILE_FIELDS = {
+    'final_grade': 'FinalGrade',
+    'risk_score': 'RiskScore'
+}
+PERCENTILES = [10, 50, 90]
+
+# Risk bands as (name, low, high); documents without a numeric RiskScore fall in none
+RISK_BANDS = [('high', 70, None), ('medium', 40, 70), ('low', None, 40)]
+
+
+def _risk_band_expression():
+    """Aggregation expression mapping RiskScore to its band name"""
+    branches = []
+    for name, low, high in RISK_BANDS:
+        conditions = [{'$isNumber': '$RiskScore'}]
+        if low is not None:
+            conditions.append({'$gte': ['$RiskScore', low]})
+        if high is not None:
+            conditions.append({'$lt': ['$RiskScore', high]})
+        branches.append({'case': {'$and': conditions}, 'then': name})
+    return {'$switch': {'branches': branches, 'default': None}}
+
+
+def build_stats_pipeline(with_percentiles=False):
+    """Build the $facet pipeline that computes all student statistics"""
+    totals = {
+        '_id': None,
+        'total': {'$sum': 1},
+        'min_FinalGrade': {'$min': '$FinalGrade'},
+        'max_FinalGrade': {'$max': '$FinalGrade'}
+    }
+    for field in AVERAGE_FIELDS.values():
+        totals[f'avg_{field}'] = {'$avg': f'${field}'}
+    for field in PERCENTILE_FIELDS.values():
+        totals[f'count_{field}'] = {'$sum': {'$cond': [{'$isNumber': f'${field}'}, 1, 0]}}
+        if with_percentiles:
+            totals[f'percentiles_{field}'] = {
+                '$percentile': {
+                    'input': f'${field}',
+                    'p': [p / 100 for p in PERCENTILES],
+                    'method': 'approximate'
+                }
+            }
+    
+    return [
+        {'$facet': {
+            'totals': [{'$group': totals}],
+            'risk': [{'$group': {'_id': _risk_band_expression(), 'count': {'$sum': 1}}}]
+        }}
+    ]
+
+
+def _totals(result):
+    return result['totals'][0] if result.get('totals') else {}
+
+
+def build_percentile_pipeline(result):
+    """Nearest-rank percentiles via sort/skip, for servers without $percentile
+    
+    Takes the stats pipeline result for the per-field counts of numeric values.
+    """
+    totals = _totals(result)
+    facets = {}
+    for field in PERCENTILE_FIELDS.values():
+        total = totals.get(f'count_{field}', 0)
+        if not total:
+            continue
+        for p in PERCENTILES:
+            rank = max(-(-p * total // 100), 1)
+            facets[f'{field}_{p}'] = [
+                {'$match': {field: {'$type': 'number'}}},
+                {'$sort': {field: 1}},
+                {'$skip': rank - 1},
+                {'$limit': 1},
+                {'$project': {'_id': 0, 'value': f'${field}'}}
+            ]
+    if not facets:
+        return None
+    return [{'$facet': facets}]
+
+
+def percentiles_from_aggregation(result):
+    """Read the $percentile accumulator results out of the stats pipeline result"""
+    totals = _totals(result)
+    percentiles = {}
+    for name, field in PERCENTILE_FIELDS.items():
+        values = totals.get(f'percentiles_{field}') or [0] * len(PERCENTILES)
+        percentiles[name] = {f'p{p}': value for p, value in zip(PERCENTILES, values)}
+    return percentiles
+
+
+def percentiles_from_fallback(result):
+    """Convert the sort/skip $facet result into the percentiles structure"""
+    percentiles = {}
+    for name, field in PERCENTILE_FIELDS.items():
+        percentiles[name] = {}
+        for p in PERCENTILES:
+            docs = result.get(f'{field}_{p}', [])
+            percentiles[name][f'p{p}'] = docs[0]['value'] if docs else 0
+    return percentiles
+
+
+def stats_from_aggregation(result):
+    """Convert the $facet result document into the stats response"""
+    totals = _totals(result)
+    
+    risk_distribution = {name: 0 for name, _, _ in RISK_BANDS}
+    for band in result.get('risk', []):
+        if band['_id'] in risk_distribution:
+            risk_distribution[band['_id']] = band['count']
+    
+    return {
+        'total_students': totals.get('total', 0),
+        'averages': {
+            name: round(totals.get(f'avg_{field}', 0), 2)
+            for name, field in AVERAGE_FIELDS.items()
+        },
+        'ranges': {
+            'final_grade': {
+                'min': totals.get('min_FinalGrade', 0),
+                'max': totals.get('max_FinalGrade', 0)
+            }
+        },
+        'risk_distribution': risk_distribution
+    }
+
+
+def empty_stats():
+    """Stats response when the statistics cannot be computed"""
+    return {
+        'total_students': 0,
+        'averages': {},
+        'ranges': {},
+        'risk_distribution': {name: 0 for name, _, _ in RISK_BANDS}
+    }
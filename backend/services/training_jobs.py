@@ -0,0 +1,221 @@
+"""
+Background training jobs
+
+POST /api/predictions/train-model queues a job and returns its id at once. The
+fit runs in a separate, lower-priority process, so it uses neither a request
+thread nor a serving worker's CPU share. Jobs are tracked in the training_jobs
+collection: any worker can report a job's status and progress, and a second
+request while a job is active gets that job instead of starting another.
+
+At most one job is active across all workers: an active job carries
+active: true, which a unique partial index allows on one document only, so two
+concurrent requests cannot both insert one. The training process heartbeats its
+job every TRAINING_HEARTBEAT_SECONDS while it runs, so a job is only taken for
+lost when its process stops heartbeating, however long the fit itself takes.
+Serving workers pick up the new model version through MLService.reload_if_changed.
+"""
+
+import os
+import time
+import uuid
+import multiprocessing
+import threading
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
+from config.database import db_config
+
+JOBS_COLLECTION = 'training_jobs'
+
+TRAINING_WORKERS = int(os.getenv('TRAINING_WORKERS', 1))
+# Added to the training process's nice value so request handling wins the CPU
+TRAINING_NICE = int(os.getenv('TRAINING_NICE', 10))
+# Seconds between heartbeats from the training process
+TRAINING_HEARTBEAT_SECONDS = int(os.getenv('TRAINING_HEARTBEAT_SECONDS', 30))
+# An active job without a heartbeat for this long is assumed lost (e.g. its worker restarted)
+TRAINING_JOB_STALE_SECONDS = int(os.getenv('TRAINING_JOB_STALE_SECONDS', 300))
+# Minimum seconds between progress writes from the training process
+PROGRESS_INTERVAL = 1.0
+
+
+def _now():
+    return datetime.now().isoformat()
+
+
+def _jobs():
+    return db_config.get_collection(JOBS_COLLECTION)
+
+
+def _update_job(job_id, **fields):
+    fields['updated_at'] = _now()
+    _jobs().update_one({'_id': job_id}, {'$set': fields})
+
+
+def _finish_job(job_id, **fields):
+    """Record a job's outcome and release the active slot"""
+    fields['updated_at'] = _now()
+    _jobs().update_one({'_id': job_id}, {'$set': fields, '$unset': {'active': ''}})
+
+
+def _ensure_job_indexes():
+    """Unique partial index that admits one active job at a time"""
+    _jobs().create_index(
+        [('active', ASCENDING)], name='one_active_job', unique=True,
+        partialFilterExpression={'active': True}
+    )
+
+
+def _heartbeat(job_id, stop):
+    """Touch the job's updated_at until stop is set (runs in a thread of the training process)"""
+    while not stop.wait(TRAINING_HEARTBEAT_SECONDS):
+        try:
+            _jobs().update_one({'_id': job_id, 'active': True}, {'$set': {'updated_at': _now()}})
+        except Exception as e:
+            print(f"Error writing training job heartbeat: {e}")
+
+
+def _init_training_process():
+    """Runs first in each training process"""
+    try:
+        os.nice(TRAINING_NICE)
+    except (AttributeError, OSError):
+        pass
+    # The API process already applied the index spec; skip the startup backfill here
+    os.environ['MONGO_ENSURE_INDEXES'] = 'false'
+
+
+def run_training_job(job_id):
+    """Train the model for one job (runs in the training process)"""
+    from services.ml_service import MLService
+
+    db_config.ensure_connected()
+    _update_job(job_id, status='running', started_at=_now(), progress=0.0, stage='starting')
+
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(job_id, stop), daemon=True).start()
+    last_write = [0.0]
+
+    def progress(fraction, stage):
+        now = time.monotonic()
+        if now - last_write[0] >= PROGRESS_INTERVAL or fraction >= 1:
+            last_write[0] = now
+            _update_job(job_id, progress=round(fraction, 3), stage=stage)
+
+    try:
+        result = MLService().train_model(progress=progress)
+    except Exception as e:
+        result = {'success': False, 'error': str(e), 'message': 'Model training failed'}
+    finally:
+        stop.set()
+
+    status = 'completed' if result.get('success') else 'failed'
+    _finish_job(
+        job_id,
+        status=status,
+        finished_at=_now(),
+        progress=1.0 if status == 'completed' else None,
+        stage='done',
+        result=result
+    )
+    return status
+
+
+class TrainingJobs:
+    """Queue of model training jobs run by a process pool"""
+
+    def __init__(self, workers=TRAINING_WORKERS):
+        self.workers = workers
+        self._pool = None
+        self._lock = threading.Lock()
+        self._indexed = False
+
+    @property
+    def pool(self):
+        # Spawned, not forked: the serving process holds MongoClient sockets and locks
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_training_process
+                    )
+        return self._pool
+
+    def submit(self):
+        """Queue a training job, or return the one already active; returns (job, created)"""
+        if not self._indexed:
+            _ensure_job_indexes()
+            self._indexed = True
+        
+        active = self.active_job()
+        if active:
+            return active, False
+
+        job = {
+            '_id': uuid.uuid4().hex,
+            'status': 'queued',
+            'active': True,
+            'progress': 0.0,
+            'stage': 'queued',
+            'created_at': _now(),
+            'updated_at': _now(),
+            'pid': os.getpid()
+        }
+        try:
+            _jobs().insert_one(job)
+        except DuplicateKeyError:
+            # Another worker queued a job between our check and the insert
+            active = self.active_job()
+            if active:
+                return active, False
+            raise
+        
+        try:
+            future = self.pool.submit(run_training_job, job['_id'])
+        except Exception as e:
+            _finish_job(job['_id'], status='failed', finished_at=_now(), error=str(e))
+            raise
+        future.add_done_callback(lambda f: self._on_done(job['_id'], f))
+        return self._public(job), True
+
+    def _on_done(self, job_id, future):
+        """Record jobs whose process died before it could report the outcome"""
+        error = future.exception()
+        if error is not None:
+            print(f"Training job {job_id} failed: {error}")
+            try:
+                _finish_job(job_id, status='failed', finished_at=_now(), error=str(error))
+            except Exception as e:
+                print(f"Error recording training job failure: {e}")
+
+    def active_job(self):
+        """The queued or running job, if any is still alive"""
+        job = _jobs().find_one({'active': True})
+        if not job:
+            return None
+        age = datetime.now() - datetime.fromisoformat(job['updated_at'])
+        if age.total_seconds() > TRAINING_JOB_STALE_SECONDS:
+            # Only if no heartbeat arrived since we read it
+            _jobs().update_one(
+                {'_id': job['_id'], 'updated_at': job['updated_at']},
+                {'$set': {'status': 'failed', 'finished_at': _now(), 'updated_at': _now(),
+                          'error': 'Training job stopped sending heartbeats'},
+                 '$unset': {'active': ''}}
+            )
+            return None
+        return self._public(job)
+
+    def get(self, job_id):
+        job = _jobs().find_one({'_id': job_id})
+        return self._public(job) if job else None
+
+    def recent(self, limit=20):
+        return [self._public(job) for job in _jobs().find().sort('created_at', DESCENDING).limit(limit)]
+
+    @staticmethod
+    def _public(job):
+        job = dict(job)
+        job['job_id'] = job.pop('_id')
+        return job
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Production server startup script - runs the API under gunicorn
+Usage:
+  python start_server.py
+  GUNICORN_WORKERS=4 GUNICORN_THREADS=8 python start_server.py
+
+For local development use `python app.py` instead.
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+def main():
+    try:
+        from gunicorn.app.wsgiapp import run
+    except ImportError:
+        print("gunicorn is not installed (it does not run on Windows).")
+        print("Install it with `pip install gunicorn`, or use `python app.py` for development.")
+        sys.exit(1)
+    
+    os.chdir(BACKEND_DIR)
+    sys.argv = ['gunicorn', '-c', os.path.join(BACKEND_DIR, 'gunicorn.conf.py'), 'wsgi:app']
+    run()
+
+if __name__ == '__main__':
+    main()
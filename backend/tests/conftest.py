@@ -0,0 +1,73 @@
+"""
+Shared fixtures: the API runs against an in-memory mongomock database
+
+pymongo.MongoClient is replaced before the app is imported, so the services
+and routes run unchanged. Run from backend/ with: python -m pytest -q
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['MONGO_ENSURE_INDEXES'] = 'false'
+os.environ.setdefault('MODEL_DIR', tempfile.mkdtemp(prefix='lernexa-models-'))
+
+import mongomock
+import pymongo
+import pytest
+
+_client = mongomock.MongoClient()
+
+
+def _mongo_client(*args, **kwargs):
+    return _client
+
+
+pymongo.MongoClient = _mongo_client
+import config.database
+config.database.MongoClient = _mongo_client
+
+from services.search import SEARCH_KEYS_FIELD, search_keys
+from services.cache import result_cache
+
+
+def make_students(count=60):
+    """Deterministic student documents with every field the API reads"""
+    students = []
+    for i in range(count):
+        students.append({
+            'StudentID': f'STU{i + 1:04d}',
+            'Name': f'Student {chr(65 + i % 26)}{i}',
+            'StudyHours': 5 + i % 20,
+            'Attendance': 40 + (i * 7) % 61,
+            'AssignmentCompletion': 50 + (i * 3) % 51,
+            'Discussions': i % 2,
+            'Resources': i % 3,
+            'StressLevel': i % 3,
+            'Internet': 1,
+            'EduTech': i % 2,
+            'OnlineCourses': i % 5,
+            'ExamScore': 40 + (i * 11) % 61,
+            'FinalGrade': (i * 13) % 101,
+            'EngagementScore': (i * 17) % 101,
+            'RiskScore': (i * 29) % 101
+        })
+    return students
+
+
+@pytest.fixture
+def students():
+    """Students collection seeded with make_students(); the result cache starts empty"""
+    collection = _client[config.database.db_config.database_name]['students']
+    collection.delete_many({})
+    # SearchKeys as the loader writes them (mongomock cannot run backfill's bulk updates)
+    collection.insert_many([{**s, SEARCH_KEYS_FIELD: search_keys(s)} for s in make_students()])
+    result_cache.clear()
+    return collection
+
+
+@pytest.fixture
+def client(students):
+    from app import app
+    return app.test_client()
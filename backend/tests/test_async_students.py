@@ -0,0 +1,102 @@
+"""
+The async student endpoints return the same responses as the sync ones
+
+mongomock has no async API, so the async collection is a thin facade over the
+same mongomock collection with the awaitable methods AsyncDataService uses.
+"""
+
+import pytest
+from config.database import async_db_config, db_config
+from services.cache import result_cache
+
+
+class _AsyncCursor:
+    def __init__(self, documents):
+        self.documents = list(documents)
+
+    async def to_list(self, length=None):
+        return self.documents if length is None else self.documents[:length]
+
+
+class _AsyncCollection:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def aggregate(self, pipeline, **kwargs):
+        kwargs.pop('maxTimeMS', None)
+        return _AsyncCursor(self.collection.aggregate(pipeline, **kwargs))
+
+    async def estimated_document_count(self):
+        return self.collection.estimated_document_count()
+
+
+@pytest.fixture
+def async_client(client, monkeypatch):
+    async def run(coro):
+        return await coro
+
+    monkeypatch.setattr(async_db_config, 'get_collection', lambda name: _AsyncCollection(db_config.get_collection(name)))
+    monkeypatch.setattr(async_db_config, 'run', run)
+    return client
+
+
+def _both(client, path):
+    sync = client.get(f'/api/students{path}')
+    async_ = client.get(f'/api/async/students{path}')
+    return sync, async_
+
+
+@pytest.mark.parametrize('path', [
+    '/',
+    '/?limit=7',
+    '/?limit=7&page=3',
+    '/?limit=5&fields=StudentID,Name',
+    '/?search=stu000',
+    '/?search=student%20b',
+    '/STU0005',
+    '/STU0005?fields=FinalGrade'
+])
+def test_async_matches_sync(async_client, path):
+    sync, async_ = _both(async_client, path)
+    assert sync.status_code == async_.status_code == 200
+    assert async_.get_json() == sync.get_json()
+
+
+def test_async_cursor_pages_match_sync(async_client):
+    sync_pages, async_pages = [], []
+    for prefix, pages in (('/api/students', sync_pages), ('/api/async/students', async_pages)):
+        url = f'{prefix}/?limit=25'
+        while url:
+            body = async_client.get(url).get_json()
+            pages.append([s['StudentID'] for s in body['students']])
+            cursor = body['pagination']['next']
+            url = f'{prefix}/?limit=25&cursor={cursor}' if cursor else None
+    assert async_pages == sync_pages
+    assert sum(len(page) for page in async_pages) == 60
+
+
+def test_async_missing_student(async_client):
+    assert async_client.get('/api/async/students/NOPE').status_code == 404
+
+
+def test_async_stats_share_the_result_cache(async_client):
+    sync = async_client.get('/api/students/stats')
+    hits = result_cache.hits
+    async_ = async_client.get('/api/async/students/stats')
+    assert async_.status_code == 200
+    assert async_.get_json() == sync.get_json()
+    assert result_cache.hits == hits + 1
+
+
+def test_async_stats_failure_is_not_cached(async_client, monkeypatch):
+    class _Failing(_AsyncCollection):
+        async def aggregate(self, pipeline, **kwargs):
+            raise RuntimeError('transient')
+
+    monkeypatch.setattr(async_db_config, 'get_collection', lambda name: _Failing(db_config.get_collection(name)))
+    assert async_client.get('/api/async/students/stats').status_code == 500
+
+    monkeypatch.setattr(async_db_config, 'get_collection', lambda name: _AsyncCollection(db_config.get_collection(name)))
+    response = async_client.get('/api/async/students/stats')
+    assert response.status_code == 200
+    assert response.get_json()['total_students'] == 60
@@ -0,0 +1,66 @@
+"""
+Staging swaps replace students in one rename and never leave it missing
+"""
+
+import mongomock
+import pytest
+from scripts.collection_swap import (
+    PREVIOUS_COLLECTION, STAGING_COLLECTION, STUDENTS_COLLECTION, prepare_staging, rollback, swap_in
+)
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().db
+    db[STUDENTS_COLLECTION].insert_many([{'StudentID': 'OLD1'}, {'StudentID': 'OLD2'}])
+    prepare_staging(db).insert_many([{'StudentID': 'NEW1'}])
+    return db
+
+
+def _ids(collection):
+    return sorted(doc['StudentID'] for doc in collection.find())
+
+
+def test_swap_without_keeping_previous(db):
+    db[PREVIOUS_COLLECTION].insert_one({'StudentID': 'STALE'})
+    assert swap_in(db, keep_previous=False) is False
+    assert _ids(db[STUDENTS_COLLECTION]) == ['NEW1']
+    assert set(db.list_collection_names()) == {STUDENTS_COLLECTION}
+
+
+def test_swap_keeps_a_copy_for_rollback(db):
+    assert swap_in(db, keep_previous=True) is True
+    assert _ids(db[STUDENTS_COLLECTION]) == ['NEW1']
+    assert _ids(db[PREVIOUS_COLLECTION]) == ['OLD1', 'OLD2']
+
+    assert rollback(db)
+    assert _ids(db[STUDENTS_COLLECTION]) == ['OLD1', 'OLD2']
+
+
+def test_failed_swap_leaves_students_in_place(db, monkeypatch):
+    rename = mongomock.collection.Collection.rename
+
+    def failing_rename(self, new_name, **kwargs):
+        if self.name == STAGING_COLLECTION:
+            raise RuntimeError('rename failed')
+        return rename(self, new_name, **kwargs)
+
+    monkeypatch.setattr(mongomock.collection.Collection, 'rename', failing_rename)
+    with pytest.raises(RuntimeError):
+        swap_in(db, keep_previous=True)
+    assert _ids(db[STUDENTS_COLLECTION]) == ['OLD1', 'OLD2']
+
+
+def test_failed_swap_restores_a_missing_students_collection(db, monkeypatch):
+    rename = mongomock.collection.Collection.rename
+
+    def lose_students(self, new_name, **kwargs):
+        if self.name == STAGING_COLLECTION:
+            self.database.drop_collection(STUDENTS_COLLECTION)
+            raise RuntimeError('rename failed')
+        return rename(self, new_name, **kwargs)
+
+    monkeypatch.setattr(mongomock.collection.Collection, 'rename', lose_students)
+    with pytest.raises(RuntimeError):
+        swap_in(db, keep_previous=True)
+    assert _ids(db[STUDENTS_COLLECTION]) == ['OLD1', 'OLD2']
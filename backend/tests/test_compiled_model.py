@@ -0,0 +1,83 @@
+"""
+CompiledModel gives the probabilities of scaler.transform + predict_proba
+
+compile_model reads sklearn's fitted tree structures, which are private, so these
+tests are what catches an sklearn upgrade that changes them.
+"""
+
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+from services.compiled_model import CompiledModel, PARITY_TOLERANCE, check_parity, compile_model
+from services.model_backends import BACKENDS, build_estimator
+
+
+def _cohort(rows=800, seed=7):
+    """Mixed integer and continuous features on different scales, like the student data"""
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([
+        rng.integers(0, 101, rows),
+        rng.integers(0, 3, rows),
+        rng.normal(60, 15, rows),
+        rng.uniform(0, 1, rows),
+        rng.integers(1, 40, rows) * 0.5
+    ]).astype(np.float64)
+    logit = 0.05 * (X[:, 0] - 50) - 0.8 * X[:, 1] + 0.04 * (X[:, 2] - 60) + rng.normal(0, 1, rows)
+    return X, (logit > 0).astype(int)
+
+
+@pytest.fixture(scope='module', params=list(BACKENDS))
+def fitted(request):
+    X, y = _cohort()
+    scaler = StandardScaler().fit(X)
+    model = build_estimator(request.param).fit(scaler.transform(X), y)
+    return model, scaler, compile_model(model, scaler), X
+
+
+def _expected(model, scaler, X):
+    return model.predict_proba(scaler.transform(X))
+
+
+def _threshold_rows(compiled, X):
+    """Rows with one feature exactly on, and just above, each folded split threshold"""
+    split = np.isfinite(compiled.threshold)
+    features, thresholds = compiled.feature[split], compiled.threshold[split]
+    base = np.repeat(X[:1], len(thresholds), axis=0)
+    on, above = base.copy(), base.copy()
+    on[np.arange(len(thresholds)), features] = thresholds
+    above[np.arange(len(thresholds)), features] = np.nextafter(thresholds, np.inf)
+    return np.vstack([on, above])
+
+
+def test_matches_sklearn_on_training_rows(fitted):
+    model, scaler, compiled, X = fitted
+    assert np.abs(compiled.predict_proba(X) - _expected(model, scaler, X)).max() <= PARITY_TOLERANCE
+
+
+def test_matches_sklearn_on_folded_thresholds(fitted):
+    # A threshold off by one ulp sends the row on it, or the one just above, the wrong way
+    model, scaler, compiled, X = fitted
+    rows = _threshold_rows(compiled, X)
+    assert len(rows)
+    assert np.abs(compiled.predict_proba(rows) - _expected(model, scaler, rows)).max() <= PARITY_TOLERANCE
+
+
+def test_matches_sklearn_with_missing_values():
+    X, y = _cohort(seed=11)
+    X[::9, 2] = np.nan
+    scaler = StandardScaler().fit(X)
+    model = build_estimator('hist_gradient_boosting').fit(scaler.transform(X), y)
+    compiled = compile_model(model, scaler)
+    assert np.abs(compiled.predict_proba(X) - _expected(model, scaler, X)).max() <= PARITY_TOLERANCE
+
+
+def test_arrays_round_trip(fitted):
+    model, scaler, compiled, X = fitted
+    restored = CompiledModel.from_arrays(compiled.to_arrays())
+    assert np.array_equal(restored.predict_proba(X), compiled.predict_proba(X))
+
+
+def test_check_parity_accepts_the_compiled_model(fitted):
+    model, scaler, compiled, X = fitted
+    assert check_parity(compiled, model, scaler) <= PARITY_TOLERANCE
+    assert check_parity(compiled, model, scaler, X) <= PARITY_TOLERANCE
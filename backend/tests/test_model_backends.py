@@ -0,0 +1,81 @@
+"""
+Progress reporting and defaults of the estimator backends
+"""
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.model_selection import RandomizedSearchCV
+import services.model_backends as model_backends
+from services.model_backends import BACKENDS, build_estimator, fit_estimator
+
+
+@pytest.fixture(scope='module')
+def data():
+    return make_classification(n_samples=600, n_features=6, random_state=3)
+
+
+def test_gradient_boosting_reports_each_stage(data):
+    calls = []
+    _, details = fit_estimator(*data, backend='gradient_boosting', search=False,
+                               progress=lambda fraction, stage: calls.append(fraction))
+    assert len(calls) >= details['boosting_iterations']
+    assert calls == sorted(calls) and calls[-1] == 1.0
+
+
+@pytest.mark.parametrize('early_stopping', [True, False])
+@pytest.mark.parametrize('steps', [1, 4, 200])
+def test_hist_increments_match_one_fit(data, monkeypatch, early_stopping, steps):
+    monkeypatch.setattr(model_backends, 'MODEL_PROGRESS_STEPS', steps)
+    reference = build_estimator('hist_gradient_boosting', early_stopping).fit(*data)
+    estimator = build_estimator('hist_gradient_boosting', early_stopping)
+    calls = []
+    model_backends._fit(estimator, *data, calls.append)
+
+    assert estimator.n_iter_ == reference.n_iter_
+    assert np.array_equal(estimator.predict_proba(data[0]), reference.predict_proba(data[0]))
+    assert estimator.get_params() == reference.get_params()
+    assert calls == sorted(calls) and calls[-1] == 1.0
+    assert len(calls) >= min(steps, 2)
+
+
+def test_gradient_boosting_fits_every_stage_by_default():
+    assert build_estimator('gradient_boosting').n_iter_no_change is None
+    assert build_estimator('hist_gradient_boosting').early_stopping is True
+
+
+@pytest.mark.parametrize('backend', list(BACKENDS))
+def test_batched_search_matches_randomized_search(data, backend, monkeypatch):
+    monkeypatch.setattr(model_backends, 'MODEL_SEARCH_ITERATIONS', 4)
+    monkeypatch.setattr(model_backends, 'MODEL_N_JOBS', 1)
+    stages = []
+    estimator, details = fit_estimator(*data, backend=backend, search=True,
+                                       progress=lambda fraction, stage: stages.append(stage))
+    reference = RandomizedSearchCV(
+        build_estimator(backend), BACKENDS[backend]['search_space'], n_iter=4,
+        cv=model_backends.MODEL_CV_FOLDS, scoring='f1', n_jobs=1, random_state=42
+    ).fit(*data)
+
+    assert details['search']['best_params'] == reference.best_params_
+    assert details['search']['cv_f1_score'] == round(reference.best_score_, 4)
+    assert np.array_equal(estimator.predict_proba(data[0]), reference.best_estimator_.predict_proba(data[0]))
+    assert stages.count('searching') == 4 and stages[-1] == 'fitting'
+
+
+def test_search_without_a_finite_score_stores_none(data, monkeypatch):
+    X, y = data
+    # As when no fold has positives: F1 is undefined and every candidate scores NaN
+    monkeypatch.setattr(model_backends, 'MODEL_SEARCH_ITERATIONS', 2)
+    monkeypatch.setattr(model_backends, 'MODEL_N_JOBS', 1)
+
+    class _Scores:
+        def __init__(self, *args, **kwargs):
+            self.cv_results_ = {'mean_test_score': np.array([np.nan])}
+
+        def fit(self, X, y):
+            return self
+
+    monkeypatch.setattr(model_backends, 'GridSearchCV', _Scores)
+    _, details = model_backends._search(build_estimator('gradient_boosting'), X, y, 'gradient_boosting',
+                                        lambda fraction: None)
+    assert details['cv_f1_score'] is None
@@ -0,0 +1,57 @@
+"""
+Concurrent promotions keep the whole history, and failed saves fail training
+"""
+
+import multiprocessing
+import pytest
+from services.model_artifacts import write_bundle
+from services.model_registry import ModelRegistry
+import services.ml_service as ml_service
+
+
+def _promote(model_dir, version):
+    ModelRegistry(model_dir).promote(version, verify=False)
+
+
+@pytest.fixture
+def versions(tmp_path):
+    ids = [f'20260101T0000{i:02d}-v{i:02d}' for i in range(8)]
+    for version in ids:
+        write_bundle(str(tmp_path), version, None, None, {'features_used': []})
+    return str(tmp_path), ids
+
+
+def test_concurrent_promotions_keep_every_entry(versions):
+    model_dir, ids = versions
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_promote, args=(model_dir, version)) for version in ids]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    registry = ModelRegistry(model_dir)
+    history = [entry['version'] for entry in registry.history()]
+    assert sorted(history) == sorted(ids)
+    assert registry.current() == history[0]
+
+
+def test_rollback_under_the_lock_returns_the_previous_version(versions):
+    model_dir, ids = versions
+    registry = ModelRegistry(model_dir)
+    registry.promote(ids[0], verify=False)
+    registry.promote(ids[1], verify=False)
+    assert registry.rollback()['model_version'] == ids[0]
+    assert registry.current() == ids[0]
+
+
+def test_failed_bundle_write_fails_the_save(client, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+
+    service = ml_service.MLService()
+    service.model_info = {}
+    monkeypatch.setattr(ml_service, 'write_bundle', fail)
+    monkeypatch.setattr(service, '_compile', lambda *args: None)
+    with pytest.raises(OSError):
+        service._save_model()
@@ -0,0 +1,32 @@
+"""
+Duplicate rows are dropped across chunks exactly as DataFrame.drop_duplicates would
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scripts.pipeline_stats import SeenRows
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 7, 250, 5000])
+def test_seen_rows_matches_duplicated(chunk_rows):
+    rng = np.random.default_rng(5)
+    frame = pd.DataFrame({
+        'StudentID': rng.integers(0, 900, 3000).astype(str),
+        'Grade': rng.integers(0, 3, 3000)
+    })
+    seen = SeenRows()
+    kept = np.concatenate([
+        seen.keep(frame.iloc[start:start + chunk_rows]) for start in range(0, len(frame), chunk_rows)
+    ])
+    assert np.array_equal(kept, ~frame.duplicated().to_numpy())
+    assert len(seen) == kept.sum()
+    # Each run is less than half the size of the one before it
+    sizes = [len(run) for run in seen.runs]
+    assert all(newer * 2 < older for older, newer in zip(sizes, sizes[1:]))
+
+
+def test_seen_rows_matches_int_and_float_chunks():
+    seen = SeenRows()
+    assert seen.keep(pd.DataFrame({'a': [1, 2]})).tolist() == [True, True]
+    assert seen.keep(pd.DataFrame({'a': [2.0, np.nan, 3.0]})).tolist() == [False, True, True]
@@ -0,0 +1,23 @@
+"""
+Argument checks of the prediction endpoints
+"""
+
+import pytest
+from services.pagination import MAX_PAGE_LIMIT
+
+
+@pytest.mark.parametrize('limit', ['abc', '0', '-3', str(MAX_PAGE_LIMIT + 1)])
+def test_at_risk_rejects_bad_limits(client, limit):
+    response = client.get(f'/api/predictions/at-risk?level=high&limit={limit}')
+    assert response.status_code == 400
+    assert 'limit' in response.get_json()['error']
+
+
+def test_at_risk_accepts_a_valid_limit(client):
+    response = client.get('/api/predictions/at-risk?level=high&limit=5')
+    assert response.status_code == 200
+    assert response.get_json()['count'] <= 5
+
+
+def test_at_risk_rejects_unknown_levels(client):
+    assert client.get('/api/predictions/at-risk?level=extreme').status_code == 400
@@ -0,0 +1,34 @@
+"""
+Paging arguments of the student list endpoints
+"""
+
+import pytest
+from services.pagination import MAX_PAGE_LIMIT
+
+
+@pytest.mark.parametrize('prefix', ['/api/students', '/api/async/students'])
+@pytest.mark.parametrize('query', [
+    'limit=0', 'limit=-5', f'limit={MAX_PAGE_LIMIT + 1}', 'limit=ten', 'page=0', 'page=-1'
+])
+def test_out_of_range_paging_is_rejected(client, prefix, query):
+    response = client.get(f'{prefix}/?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_limit_bounds_are_accepted(client):
+    body = client.get('/api/students/?limit=1').get_json()
+    assert len(body['students']) == 1
+    assert body['pagination']['pages'] == 60
+
+    body = client.get(f'/api/students/?limit={MAX_PAGE_LIMIT}').get_json()
+    assert len(body['students']) == 60
+    assert body['pagination']['pages'] == 1
+    assert body['pagination']['next'] is None
+
+
+def test_dashboard_page_size_is_accepted(client):
+    # frontend/src/pages/Dashboard.tsx loads the cohort with limit=2000
+    response = client.get('/api/students/?page=1&limit=2000')
+    assert response.status_code == 200
+    assert len(response.get_json()['students']) == 60
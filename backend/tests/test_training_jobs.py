@@ -0,0 +1,88 @@
+"""
+One active training job across workers, and stale-job detection
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from config.database import db_config
+import services.training_jobs as training_jobs
+from services.training_jobs import TrainingJobs
+
+
+class _Future:
+    def add_done_callback(self, callback):
+        pass
+
+
+class _Pool:
+    """Accepts jobs without running them"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, job_id):
+        self.submitted.append(job_id)
+        return _Future()
+
+
+@pytest.fixture
+def jobs_collection():
+    db_config.ensure_connected()
+    collection = db_config.get_collection(training_jobs.JOBS_COLLECTION)
+    collection.drop()
+    return collection
+
+
+def _queue(pool):
+    queue = TrainingJobs()
+    queue._pool = pool
+    return queue
+
+
+def test_concurrent_submits_start_one_job(jobs_collection):
+    pool = _Pool()
+    queues = [_queue(pool) for _ in range(8)]
+    with ThreadPoolExecutor(len(queues)) as executor:
+        results = list(executor.map(lambda queue: queue.submit(), queues))
+
+    assert sum(created for _, created in results) == 1
+    assert len({job['job_id'] for job, _ in results}) == 1
+    assert len(pool.submitted) == 1
+    assert jobs_collection.count_documents({'active': True}) == 1
+
+
+def test_finished_job_frees_the_slot(jobs_collection):
+    queue = _queue(_Pool())
+    job, _ = queue.submit()
+    training_jobs._finish_job(job['job_id'], status='completed')
+
+    assert queue.active_job() is None
+    second, created = queue.submit()
+    assert created and second['job_id'] != job['job_id']
+
+
+def test_job_without_heartbeats_is_replaced(jobs_collection):
+    queue = _queue(_Pool())
+    job, _ = queue.submit()
+    jobs_collection.update_one({'_id': job['job_id']}, {'$set': {'updated_at': '2000-01-01T00:00:00'}})
+
+    second, created = queue.submit()
+    assert created
+    stale = jobs_collection.find_one({'_id': job['job_id']})
+    assert stale['status'] == 'failed' and 'active' not in stale
+
+
+def test_heartbeat_keeps_a_long_job_alive(jobs_collection, monkeypatch):
+    queue = _queue(_Pool())
+    job, _ = queue.submit()
+    jobs_collection.update_one({'_id': job['job_id']}, {'$set': {'updated_at': '2000-01-01T00:00:00'}})
+
+    class _Stop:
+        calls = 0
+
+        def wait(self, timeout):
+            self.calls += 1
+            return self.calls > 1
+
+    training_jobs._heartbeat(job['job_id'], _Stop())
+    assert queue.active_job()['job_id'] == job['job_id']
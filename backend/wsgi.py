@@ -0,0 +1,36 @@
+"""
+WSGI entry point for production servers (gunicorn)
+
+Importing this module builds the Flask app and its services and loads the ML
+model. With gunicorn's preload_app this happens once in the master process, so
+workers share the model's memory pages copy-on-write, and the memory-mapped
+bundle arrays (services.model_artifacts) through the page cache.
+"""
+
+import gc
+from app import app
+from services.container import services
+
+WARMUP_PATHS = ['/api/health', '/api/predictions/model-info']
+
+def preload():
+    """Build the shared services and load the model before workers fork"""
+    services.data_service
+    services.insights_service
+    services.trends_service
+    services.ml_service
+
+def warmup():
+    """Issue internal requests so the first real request pays no lazy setup cost"""
+    client = app.test_client()
+    for path in WARMUP_PATHS:
+        try:
+            response = client.get(path)
+            print(f"Warmup {path}: {response.status_code}")
+        except Exception as e:
+            print(f"Warmup {path} failed: {e}")
+
+preload()
+# Move everything loaded so far out of the GC's tracked generations so collections
+# in the workers do not touch (and un-share) the pages inherited from the master
+gc.freeze()
@@ -5,17 +5,25 @@ import api from '../services/api'
 export default function Students() {
   const [students, setStudents] = useState<any[]>([])
   const [page, setPage] = useState(1)
+  // cursors[i] is the pagination token for page i + 1 (page 1 needs none)
+  const [cursors, setCursors] = useState<(string | null)[]>([null])
   const [loading, setLoading] = useState(false)
   const [columns, setColumns] = useState<string[]>([])
 
   useEffect(() => {
     setLoading(true)
     api
-      .get('/students', { params: { page, limit: 200 } })
+      .get('/students', { params: { limit: 200, fields: 'list', cursor: cursors[page - 1] ?? undefined } })
       .then((res) => {
         const data = res.data
         const list = Array.isArray(data) ? data : data?.students ?? []
         setStudents(list)
+        const next = data?.pagination?.next ?? null
+        setCursors((prev) => {
+          const updated = prev.slice(0, page)
+          updated[page] = next
+          return updated
+        })
 
         const cols = new Set<string>()
         list.forEach((s: any) => Object.keys(s || {}).forEach((k) => cols.add(k)))
@@ -115,7 +123,8 @@ export default function Students() {
         <span className="text-sm font-medium text-gray-700 dark:text-gray-300">Page {page}</span>
         <button 
           onClick={() => setPage((p) => p + 1)}
-          className="px-4 py-2 bg-blue-600 hover:bg-blue-700 text-white font-medium rounded-lg transition-colors"
+          className="px-4 py-2 bg-blue-600 hover:bg-blue-700 text-white font-medium rounded-lg transition-colors disabled:opacity-50"
+          disabled={!cursors[page]}
         >
           Next →
         </button>